@@ -0,0 +1,47 @@
+from logging.config import fileConfig
+from alembic import context
+from app.db import base_class  # noqa: F401  registers every model on Base.metadata
+from app.db.base import Base
+from app.db import search
+from app.db.session import engine
+
+config = context.config
+
+if config.config_file_name is not None and config.attributes.get("configure_logger", True):
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+def include_name(name, type_, parent_names) -> bool:
+    # The FTS index and its shadow tables are created by migrations, not models
+    return not (type_ == "table" and name.startswith(search.POST_FTS))
+
+def run_migrations_offline() -> None:
+    """Emit SQL to stdout instead of running it"""
+    context.configure(
+        url=str(engine.url),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+        include_name=include_name,
+        render_as_batch=True,
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+def run_migrations_online() -> None:
+    # Reuse the app engine so migrations see the same pragmas and pool settings
+    with engine.connect() as connection:
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            include_name=include_name,
+            render_as_batch=True,
+        )
+        with context.begin_transaction():
+            context.run_migrations()
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
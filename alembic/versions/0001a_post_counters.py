@@ -0,0 +1,30 @@
+"""post counters
+
+Persists likes_count and comments_count on post and fills them from the
+like and comment tables.
+
+Revision ID: 0001a
+Revises: 0001
+Create Date: 2026-10-17 00:32:40.118204
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0001a'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.add_column('post', sa.Column('likes_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('post', sa.Column('comments_count', sa.Integer(), server_default='0', nullable=False))
+    op.execute(
+        'UPDATE post SET '
+        'likes_count = (SELECT count(*) FROM "like" WHERE "like".post_id = post.id), '
+        'comments_count = (SELECT count(*) FROM comment WHERE comment.post_id = post.id)'
+    )
+
+def downgrade() -> None:
+    with op.batch_alter_table('post') as batch_op:
+        batch_op.drop_column('comments_count')
+        batch_op.drop_column('likes_count')
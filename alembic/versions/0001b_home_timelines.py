@@ -0,0 +1,66 @@
+"""home timelines
+
+Adds user.fanout_on_read and the timeline_entry table, then materializes
+every timeline from existing posts and follows the way rebuild_timelines
+does: each user's own posts plus those of followed authors, newest
+TIMELINE_MAX_LENGTH kept. Authors with more than FANOUT_MAX_FOLLOWERS
+followers are switched to fan-out on read instead of being copied.
+
+Revision ID: 0001b
+Revises: 0001a
+Create Date: 2026-10-17 00:41:05.730912
+"""
+from alembic import op
+import sqlalchemy as sa
+from app.core.config import settings
+
+revision = '0001b'
+down_revision = '0001a'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.add_column('user', sa.Column('fanout_on_read', sa.Boolean(), server_default=sa.false(), nullable=False))
+    op.create_table('timeline_entry',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('post_id', sa.Integer(), nullable=False),
+    sa.Column('author_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['author_id'], ['user.id'], ),
+    sa.ForeignKeyConstraint(['post_id'], ['post.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'post_id')
+    )
+    op.create_index('ix_timeline_entry_post_id', 'timeline_entry', ['post_id'])
+    op.create_index('ix_timeline_entry_user_created', 'timeline_entry', ['user_id', 'created_at', 'post_id'])
+
+    op.execute(
+        sa.text(
+            'UPDATE "user" SET fanout_on_read = true WHERE '
+            '(SELECT count(*) FROM followers WHERE followers.followed_id = "user".id) > :max_followers'
+        ).bindparams(max_followers=settings.FANOUT_MAX_FOLLOWERS)
+    )
+    op.execute(
+        sa.text(
+            'INSERT INTO timeline_entry (user_id, post_id, author_id, created_at) '
+            'SELECT user_id, post_id, author_id, created_at FROM ('
+            'SELECT recipients.user_id, post.id AS post_id, post.author_id, post.created_at, '
+            'row_number() OVER (PARTITION BY recipients.user_id '
+            'ORDER BY post.created_at DESC, post.id DESC) AS position '
+            'FROM ('
+            'SELECT id AS user_id, id AS author_id FROM "user" '
+            'UNION ALL '
+            'SELECT followers.follower_id, followers.followed_id FROM followers '
+            'JOIN "user" ON "user".id = followers.followed_id WHERE NOT "user".fanout_on_read'
+            ') AS recipients '
+            'JOIN post ON post.author_id = recipients.author_id'
+            ') AS ranked WHERE position <= :max_length'
+        ).bindparams(max_length=settings.TIMELINE_MAX_LENGTH)
+    )
+
+def downgrade() -> None:
+    op.drop_index('ix_timeline_entry_user_created', table_name='timeline_entry')
+    op.drop_index('ix_timeline_entry_post_id', table_name='timeline_entry')
+    op.drop_table('timeline_entry')
+    with op.batch_alter_table('user') as batch_op:
+        batch_op.drop_column('fanout_on_read')
@@ -0,0 +1,23 @@
+"""media reference indexes
+
+Indexes post.image_url and user.profile_picture so the media collector can
+check whether a stored image is still referenced.
+
+Revision ID: 0001c
+Revises: 0001b
+Create Date: 2026-10-17 00:58:22.604417
+"""
+from alembic import op
+
+revision = '0001c'
+down_revision = '0001b'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.create_index('ix_post_image_url', 'post', ['image_url'])
+    op.create_index('ix_user_profile_picture', 'user', ['profile_picture'])
+
+def downgrade() -> None:
+    op.drop_index('ix_user_profile_picture', table_name='user')
+    op.drop_index('ix_post_image_url', table_name='post')
@@ -0,0 +1,29 @@
+"""hot query indexes
+
+Composite indexes for the keyset-paginated post list, pulled feed authors,
+comment pages, a viewer's likes and follower lookups.
+
+Revision ID: 0002
+Revises: 0001c
+Create Date: 2026-10-17 00:45:52.275875
+"""
+from alembic import op
+
+revision = '0002'
+down_revision = '0001c'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.create_index('ix_post_author_created', 'post', ['author_id', 'created_at', 'id'])
+    op.create_index('ix_post_created', 'post', ['created_at', 'id'])
+    op.create_index('ix_comment_post_created', 'comment', ['post_id', 'created_at', 'id'])
+    op.create_index('ix_like_user_post', 'like', ['user_id', 'post_id'])
+    op.create_index('ix_followers_followed_follower', 'followers', ['followed_id', 'follower_id'])
+
+def downgrade() -> None:
+    op.drop_index('ix_followers_followed_follower', table_name='followers')
+    op.drop_index('ix_like_user_post', table_name='like')
+    op.drop_index('ix_comment_post_created', table_name='comment')
+    op.drop_index('ix_post_created', table_name='post')
+    op.drop_index('ix_post_author_created', table_name='post')
@@ -0,0 +1,30 @@
+"""follow counts
+
+Persists followers_count and following_count on user and fills them from
+the followers table.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 01:02:11.537210
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.add_column('user', sa.Column('followers_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('user', sa.Column('following_count', sa.Integer(), server_default='0', nullable=False))
+    op.execute(
+        'UPDATE "user" SET '
+        'followers_count = (SELECT count(*) FROM followers WHERE followers.followed_id = "user".id), '
+        'following_count = (SELECT count(*) FROM followers WHERE followers.follower_id = "user".id)'
+    )
+
+def downgrade() -> None:
+    with op.batch_alter_table('user') as batch_op:
+        batch_op.drop_column('following_count')
+        batch_op.drop_column('followers_count')
@@ -0,0 +1,25 @@
+"""post version
+
+Adds post.version for ETags and indexes user.updated_at so the latest
+profile edit is a single index lookup.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 01:38:40.208113
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.add_column('post', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+    op.create_index('ix_user_updated_at', 'user', ['updated_at'])
+
+def downgrade() -> None:
+    op.drop_index('ix_user_updated_at', table_name='user')
+    with op.batch_alter_table('post') as batch_op:
+        batch_op.drop_column('version')
@@ -0,0 +1,49 @@
+"""post search
+
+Adds the post_fts FTS5 index with the triggers that keep it in step with
+post, and indexes the posts that already exist. SQLite only.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 02:10:12.514377
+"""
+from alembic import op
+
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    op.execute(
+        "CREATE VIRTUAL TABLE post_fts USING fts5("
+        "content, content='post', content_rowid='id', "
+        "tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+    )
+    op.execute(
+        "CREATE TRIGGER post_fts_insert AFTER INSERT ON post BEGIN "
+        "INSERT INTO post_fts (rowid, content) VALUES (new.id, new.content); "
+        "END"
+    )
+    op.execute(
+        "CREATE TRIGGER post_fts_delete AFTER DELETE ON post BEGIN "
+        "INSERT INTO post_fts (post_fts, rowid, content) VALUES ('delete', old.id, old.content); "
+        "END"
+    )
+    op.execute(
+        "CREATE TRIGGER post_fts_update AFTER UPDATE OF content ON post BEGIN "
+        "INSERT INTO post_fts (post_fts, rowid, content) VALUES ('delete', old.id, old.content); "
+        "INSERT INTO post_fts (rowid, content) VALUES (new.id, new.content); "
+        "END"
+    )
+    op.execute("INSERT INTO post_fts (post_fts) VALUES ('rebuild')")
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    op.execute("DROP TRIGGER post_fts_update")
+    op.execute("DROP TRIGGER post_fts_delete")
+    op.execute("DROP TRIGGER post_fts_insert")
+    op.execute("DROP TABLE post_fts")
@@ -0,0 +1,30 @@
+"""post score
+
+Adds post_score, the trending score per post. Scores start empty and fill
+from new likes and comments.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17 01:11:52.704224
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.create_table(
+        'post_score',
+        sa.Column('post_id', sa.Integer(), nullable=False),
+        sa.Column('score', sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(['post_id'], ['post.id']),
+        sa.PrimaryKeyConstraint('post_id'),
+    )
+    op.create_index('ix_post_score_score', 'post_score', ['score', 'post_id'])
+
+def downgrade() -> None:
+    op.drop_index('ix_post_score_score', table_name='post_score')
+    op.drop_table('post_score')
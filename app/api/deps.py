@@ -1,9 +1,13 @@
 from typing import Generator, Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
-from app.db.session import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, make_transient_to_detached
+from app.db.session import get_async_db, get_db
+from app.core.cache import TTLCache
 from app.core.security import verify_token
+from app.core.pagination import Cursor, RankCursor, decode_cursor, decode_rank_cursor
 from app.core.config import settings
 from app.models.user import User
 
@@ -11,23 +15,60 @@ oauth2_scheme = OAuth2PasswordBearer(
     tokenUrl=f"{settings.API_V1_STR}/auth/login"
 )
 
-def get_current_user(
-    db: Session = Depends(get_db),
-    token: str = Depends(oauth2_scheme)
-) -> User:
-    credentials_exception = HTTPException(
+# Column snapshots of authenticated users, keyed by (user id, token)
+_user_cache = TTLCache(
+    maxsize=settings.AUTH_CACHE_MAX_ENTRIES,
+    ttl=settings.AUTH_CACHE_TTL_SECONDS
+)
+
+def invalidate_user_cache(user_id: int) -> None:
+    """Forget cached principals of a user after their row changes"""
+    _user_cache.discard_where(lambda key: key[0] == user_id)
+
+def _remember_user(user: User, token: str) -> None:
+    _user_cache.set(
+        (user.id, token),
+        {column.key: getattr(user, column.key) for column in User.__table__.columns}
+    )
+
+def _cached_user(user_id: int, token: str) -> Optional[User]:
+    # Rebuild the snapshot as a detached instance that a session can adopt as
+    # if just loaded, so relationships and updates behave normally
+    values = _user_cache.get((user_id, token))
+    if values is None:
+        return None
+    user = User(**values)
+    make_transient_to_detached(user)
+    return user
+
+def _load_user(db: Session, user_id: int, token: str, use_cache: bool = True) -> Optional[User]:
+    cached = _cached_user(user_id, token) if use_cache else None
+    if cached is not None:
+        return db.merge(cached, load=False)
+    user = db.query(User).filter(User.id == user_id).first()
+    if user is not None:
+        _remember_user(user, token)
+    return user
+
+async def _load_user_async(db: AsyncSession, user_id: int, token: str) -> Optional[User]:
+    cached = _cached_user(user_id, token)
+    if cached is not None:
+        return await db.merge(cached, load=False)
+    user = (await db.execute(select(User).where(User.id == user_id))).scalar_one_or_none()
+    if user is not None:
+        _remember_user(user, token)
+    return user
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    
-    user_id = verify_token(token)
-    if user_id is None:
-        raise credentials_exception
-        
-    user = db.query(User).filter(User.id == user_id).first()
+
+def _check_active(user: Optional[User]) -> User:
     if user is None:
-        raise credentials_exception
+        raise _credentials_exception()
         
     if not user.is_active:
         raise HTTPException(
@@ -37,6 +78,42 @@ def get_current_user(
         
     return user
 
+def get_current_user(
+    db: Session = Depends(get_db),
+    token: str = Depends(oauth2_scheme)
+) -> User:
+    user_id = verify_token(token)
+    if user_id is None:
+        raise _credentials_exception()
+        
+    return _check_active(_load_user(db, user_id, token))
+
+def get_current_user_fresh(
+    db: Session = Depends(get_db),
+    token: str = Depends(oauth2_scheme)
+) -> User:
+    """``get_current_user`` read from the database, never from the cache.
+
+    For endpoints that return or modify the user's own row: invalidation only
+    reaches this process's cache, so another worker's copy may be stale, and
+    updating a stale copy would skip writes that match its old values.
+    """
+    user_id = verify_token(token)
+    if user_id is None:
+        raise _credentials_exception()
+
+    return _check_active(_load_user(db, user_id, token, use_cache=False))
+
+async def get_current_user_async(
+    db: AsyncSession = Depends(get_async_db),
+    token: str = Depends(oauth2_scheme)
+) -> User:
+    user_id = verify_token(token)
+    if user_id is None:
+        raise _credentials_exception()
+        
+    return _check_active(await _load_user_async(db, user_id, token))
+
 def get_current_active_user(
     current_user: User = Depends(get_current_user)
 ) -> User:
@@ -56,4 +133,37 @@ def get_optional_current_user(
     try:
         return get_current_user(db=db, token=token)
     except HTTPException:
-        return None
\ No newline at end of file
+        return None
+
+async def get_optional_current_user_async(
+    db: AsyncSession = Depends(get_async_db),
+    token: Optional[str] = Depends(oauth2_scheme)
+) -> Optional[User]:
+    if token is None:
+        return None
+    try:
+        return await get_current_user_async(db=db, token=token)
+    except HTTPException:
+        return None
+
+def get_cursor(cursor: Optional[str] = None) -> Optional[Cursor]:
+    if cursor is None:
+        return None
+    decoded = decode_cursor(cursor)
+    if decoded is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+    return decoded
+
+def get_rank_cursor(cursor: Optional[str] = None) -> Optional[RankCursor]:
+    if cursor is None:
+        return None
+    decoded = decode_rank_cursor(cursor)
+    if decoded is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+    return decoded
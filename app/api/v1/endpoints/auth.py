@@ -2,7 +2,8 @@ from datetime import timedelta
 from typing import Any
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app import schemas, models
 from app.core import security
 from app.core.config import settings
@@ -11,13 +12,15 @@ from app.api import deps
 router = APIRouter()
 
 @router.post("/register", response_model=schemas.User)
-def register(
+async def register(
     *,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     user_in: schemas.UserCreate
 ) -> Any:
+    # Async throughout, so a request waiting on the hash pool holds no
+    # threadpool thread that other sync endpoints need
     # Check if user with this email exists
-    user = db.query(models.User).filter(models.User.email == user_in.email).first()
+    user = await db.scalar(select(models.User.id).where(models.User.email == user_in.email))
     if user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -25,7 +28,7 @@ def register(
         )
     
     # Check if username is taken
-    user = db.query(models.User).filter(models.User.username == user_in.username).first()
+    user = await db.scalar(select(models.User.id).where(models.User.username == user_in.username))
     if user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -37,29 +40,29 @@ def register(
         email=user_in.email,
         username=user_in.username,
         full_name=user_in.full_name,
-        hashed_password=security.get_password_hash(user_in.password),
+        hashed_password=await security.get_password_hash_async(user_in.password),
     )
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
     
     return user
 
 @router.post("/login", response_model=schemas.Token)
-def login(
-    db: Session = Depends(deps.get_db),
+async def login(
+    db: AsyncSession = Depends(deps.get_async_db),
     form_data: OAuth2PasswordRequestForm = Depends()
 ) -> Any:
     """OAuth2 compatible token login, get an access token for future requests"""
     # Try to authenticate with email
-    user = db.query(models.User).filter(models.User.email == form_data.username).first()
+    user = await db.scalar(select(models.User).where(models.User.email == form_data.username))
     if not user:
         # Try to authenticate with username
-        user = db.query(models.User).filter(
-            models.User.username == form_data.username
-        ).first()
+        user = await db.scalar(
+            select(models.User).where(models.User.username == form_data.username)
+        )
     
-    if not user or not security.verify_password(form_data.password, user.hashed_password):
+    if not user or not await security.verify_password_async(form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email/username or password",
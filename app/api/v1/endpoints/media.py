@@ -0,0 +1,21 @@
+from typing import Any
+import os
+import anyio
+from fastapi import APIRouter, HTTPException, Request, status
+from app.core import media
+
+router = APIRouter()
+
+@router.api_route("/{filename:path}", methods=["GET", "HEAD"])
+async def get_media(filename: str, request: Request) -> Any:
+    """Serve an uploaded image with ETag, conditional and range support"""
+    path = media.resolve_path(filename)
+    if path is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="File not found"
+        )
+    
+    stat = await anyio.to_thread.run_sync(os.stat, path)
+    etag = await media.file_etag(path, stat)
+    return media.MediaFileResponse(path, stat, etag, request.headers, request.method)
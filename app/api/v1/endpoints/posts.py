@@ -1,13 +1,16 @@
-from typing import Any, List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from datetime import datetime, timezone
+from typing import Any, List, Optional, Union
+import anyio
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from app import models, schemas
+from app import crud, models, schemas
 from app.api import deps
+from app.core import conditional, images, serialization
 from app.core.config import settings
-import os
-from PIL import Image
-from datetime import datetime
+from app.core.executors import PoolUnavailable
+from app.core.pagination import Cursor, RankCursor, paginate
+from app.db import search
 
 router = APIRouter()
 
@@ -24,10 +27,21 @@ def create_post(
         author_id=current_user.id
     )
     db.add(post)
+    db.flush()
+    crud.fan_out_post(db, post.id, current_user.id)
     db.commit()
     db.refresh(post)
     return post
 
+def _replace_post_image(db: Session, post: models.Post, image_url: str) -> models.Post:
+    previous_image = post.image_url
+    post.image_url = image_url
+    db.add(post)
+    db.commit()
+    if previous_image != image_url:
+        crud.collect_media(db, [previous_image])
+    return crud.get_post(db, post.id)
+
 @router.post("/{post_id}/image", response_model=schemas.Post)
 async def upload_post_image(
     *,
@@ -37,7 +51,8 @@ async def upload_post_image(
     current_user: models.User = Depends(deps.get_current_user)
 ) -> Any:
     """Upload image for a post"""
-    post = db.query(models.Post).filter(models.Post.id == post_id).first()
+    # The session and the media store are blocking; use them from a thread
+    post = await anyio.to_thread.run_sync(db.get, models.Post, post_id)
     if not post or post.author_id != current_user.id:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -50,105 +65,169 @@ async def upload_post_image(
             detail="Invalid file type"
         )
     
-    # Create media directory if it doesn't exist
-    os.makedirs(settings.MEDIA_PATH, exist_ok=True)
-    
-    # Generate unique filename
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = f"post_{post_id}_{timestamp}.jpg"
-    file_path = os.path.join(settings.MEDIA_PATH, filename)
+    try:
+        data = await images.read_upload(file, settings.MAX_IMAGE_SIZE)
+    except images.ImageTooLarge:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail="Image too large"
+        )
     
+    # Decode, resize and store every rendition in the image worker pool
     try:
-        with Image.open(file.file) as img:
-            # Resize if needed while maintaining aspect ratio
-            if img.height > 1080 or img.width > 1080:
-                img.thumbnail((1080, 1080))
-            img.save(file_path, "JPEG")
-        
-        post.image_url = filename
-        db.add(post)
-        db.commit()
-        db.refresh(post)
-        return post
-        
-    except Exception as e:
+        image_url = await images.image_pool.run_async(
+            images.render_image,
+            data,
+            images.POST_RENDITIONS,
+            settings.MEDIA_PATH,
+            settings.IMAGE_WEBP
+        )
+    except PoolUnavailable:
+        raise
+    except Exception:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Could not process image"
         )
+    
+    return await anyio.to_thread.run_sync(_replace_post_image, db, post, image_url)
 
-@router.get("/", response_model=List[schemas.PostWithInteractions])
-def get_posts(
+@router.get("/", response_model=Union[schemas.PostPage, schemas.PostSummaryPage])
+async def get_posts(
     *,
-    db: Session = Depends(deps.get_db),
-    skip: int = 0,
-    limit: int = 20,
-    current_user: Optional[models.User] = Depends(deps.get_optional_current_user)
+    db: AsyncSession = Depends(deps.get_async_db),
+    cursor: Optional[Cursor] = Depends(deps.get_cursor),
+    limit: int = Query(20, ge=1, le=100),
+    view: schemas.PostView = schemas.PostView.full,
+    current_user: Optional[models.User] = Depends(deps.get_optional_current_user_async)
 ) -> Any:
-    """Get all posts with optional pagination"""
-    posts = db.query(models.Post)\
-        .order_by(models.Post.created_at.desc())\
-        .offset(skip)\
-        .limit(limit)\
-        .all()
-    
-    # Add interaction info if user is logged in
-    if current_user:
-        for post in posts:
-            post.user_has_liked = any(like.user_id == current_user.id for like in post.likes)
-            post.likes_count = len(post.likes)
-            post.comments_count = len(post.comments)
-    
-    return posts
+    """Get all posts, newest first, with cursor pagination"""
+    page = await db.run_sync(
+        crud.list_posts,
+        cursor,
+        limit,
+        view == schemas.PostView.summary,
+        current_user.id if current_user else None
+    )
+    return serialization.render(_model_for(view, schemas.PostPage, schemas.PostSummaryPage), page)
 
-@router.get("/feed", response_model=List[schemas.PostWithInteractions])
-def get_feed(
+@router.get("/feed", response_model=Union[schemas.PostPage, schemas.PostSummaryPage])
+async def get_feed(
     *,
-    db: Session = Depends(deps.get_db),
-    skip: int = 0,
-    limit: int = 20,
-    current_user: models.User = Depends(deps.get_current_user)
+    db: AsyncSession = Depends(deps.get_async_db),
+    cursor: Optional[Cursor] = Depends(deps.get_cursor),
+    limit: int = Query(20, ge=1, le=100),
+    view: schemas.PostView = schemas.PostView.full,
+    current_user: models.User = Depends(deps.get_current_user_async)
 ) -> Any:
     """Get posts from followed users"""
-    following_ids = [user.id for user in current_user.following]
-    following_ids.append(current_user.id)  # Include own posts
-    
-    posts = db.query(models.Post)\
-        .filter(models.Post.author_id.in_(following_ids))\
-        .order_by(models.Post.created_at.desc())\
-        .offset(skip)\
-        .limit(limit)\
-        .all()
-    
-    # Add interaction info
-    for post in posts:
-        post.user_has_liked = any(like.user_id == current_user.id for like in post.likes)
-        post.likes_count = len(post.likes)
-        post.comments_count = len(post.comments)
-    
-    return posts
+    page = await db.run_sync(
+        crud.feed_page,
+        current_user.id,
+        cursor,
+        limit,
+        view == schemas.PostView.summary
+    )
+    return serialization.render(_model_for(view, schemas.PostPage, schemas.PostSummaryPage), page)
+
+# These are declared before /{post_id} so "batch", "trending" and "search" are not parsed as post ids
+@router.get("/batch", response_model=Union[schemas.PostBatch, schemas.PostSummaryBatch])
+async def get_posts_batch(
+    *,
+    db: AsyncSession = Depends(deps.get_async_db),
+    ids: List[int] = Query([], max_length=settings.BATCH_MAX_ITEMS),
+    view: schemas.PostView = schemas.PostView.full,
+    current_user: Optional[models.User] = Depends(deps.get_optional_current_user_async)
+) -> Any:
+    """Get many posts by ID in request order; unknown IDs are listed in missing"""
+    batch = await db.run_sync(
+        crud.get_posts_batch,
+        ids,
+        view == schemas.PostView.summary,
+        current_user.id if current_user else None
+    )
+    return serialization.render(_model_for(view, schemas.PostBatch, schemas.PostSummaryBatch), batch)
+
+@router.get("/trending", response_model=Union[schemas.PostPage, schemas.PostSummaryPage])
+async def get_trending(
+    *,
+    db: AsyncSession = Depends(deps.get_async_db),
+    cursor: Optional[RankCursor] = Depends(deps.get_rank_cursor),
+    limit: int = Query(20, ge=1, le=100),
+    view: schemas.PostView = schemas.PostView.full,
+    current_user: Optional[models.User] = Depends(deps.get_optional_current_user_async)
+) -> Any:
+    """Get posts with the most recent engagement, highest trending score first"""
+    page = await db.run_sync(
+        crud.trending_page,
+        cursor,
+        limit,
+        view == schemas.PostView.summary,
+        current_user.id if current_user else None
+    )
+    return serialization.render(_model_for(view, schemas.PostPage, schemas.PostSummaryPage), page)
+
+@router.get("/search", response_model=Union[schemas.PostPage, schemas.PostSummaryPage])
+async def search_posts(
+    *,
+    db: AsyncSession = Depends(deps.get_async_db),
+    q: str = Query(..., min_length=1, max_length=200),
+    cursor: Optional[RankCursor] = Depends(deps.get_rank_cursor),
+    limit: int = Query(20, ge=1, le=100),
+    view: schemas.PostView = schemas.PostView.full,
+    current_user: Optional[models.User] = Depends(deps.get_optional_current_user_async)
+) -> Any:
+    """Search posts by words in their content, best match first; end a word with * to match a prefix"""
+    if not search.supported(db.bind):
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail="Search is not available on this database"
+        )
+    page = await db.run_sync(
+        crud.search_posts,
+        q,
+        cursor,
+        limit,
+        view == schemas.PostView.summary,
+        current_user.id if current_user else None
+    )
+    return serialization.render(_model_for(view, schemas.PostPage, schemas.PostSummaryPage), page)
 
 @router.get("/{post_id}", response_model=schemas.PostWithInteractions)
-def get_post(
+async def get_post(
     *,
     post_id: int,
-    db: Session = Depends(deps.get_db),
-    current_user: Optional[models.User] = Depends(deps.get_optional_current_user)
+    request: Request,
+    db: AsyncSession = Depends(deps.get_async_db),
+    current_user: Optional[models.User] = Depends(deps.get_optional_current_user_async)
 ) -> Any:
     """Get post by ID"""
-    post = db.query(models.Post).filter(models.Post.id == post_id).first()
+    viewer_id = current_user.id if current_user else None
+    # Read the validator before the post, so the ETag is never newer than the body
+    state = await db.run_sync(crud.post_cache_state, post_id, viewer_id)
+    if state is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Post not found"
+        )
+
+    headers = {}
+    if conditional.settled(state[1]):
+        headers = conditional.validator_headers(
+            conditional.make_etag("post", post_id, *state),
+            cache_control=conditional.PRIVATE_CACHE_CONTROL
+        )
+        if conditional.is_not_modified(request.headers, headers["ETag"]):
+            return conditional.not_modified(headers)
+
+    post = await db.run_sync(crud.get_post_for_viewer, post_id, viewer_id)
     if not post:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Post not found"
         )
     
-    if current_user:
-        post.user_has_liked = any(like.user_id == current_user.id for like in post.likes)
-        post.likes_count = len(post.likes)
-        post.comments_count = len(post.comments)
-    
-    return post
+    return serialization.render(schemas.PostWithInteractions, post, headers)
 
 @router.put("/{post_id}", response_model=schemas.Post)
 def update_post(
@@ -171,8 +250,7 @@ def update_post(
     
     db.add(post)
     db.commit()
-    db.refresh(post)
-    return post
+    return crud.get_post(db, post_id)
 
 @router.delete("/{post_id}")
 def delete_post(
@@ -189,79 +267,59 @@ def delete_post(
             detail="Post not found or not owned by user"
         )
     
-    # Delete post image if exists
-    if post.image_url:
-        image_path = os.path.join(settings.MEDIA_PATH, post.image_url)
-        if os.path.exists(image_path):
-            os.remove(image_path)
-    
+    # Remove engagement rows in bulk rather than loading them for the ORM cascade
+    db.query(models.Like)\
+        .filter(models.Like.post_id == post_id)\
+        .delete(synchronize_session=False)
+    db.query(models.Comment)\
+        .filter(models.Comment.post_id == post_id)\
+        .delete(synchronize_session=False)
+    crud.remove_post_from_timelines(db, post_id)
+    crud.remove_post_from_trending(db, post_id)
+    image_url = post.image_url
     db.delete(post)
     db.commit()
+    
+    # Delete the post image unless another post or profile still uses it
+    crud.collect_media(db, [image_url])
     return {"status": "success"}
 
-@router.post("/{post_id}/like", response_model=schemas.Post)
+@router.post("/{post_id}/like", response_model=schemas.LikeStatus)
 def like_post(
     *,
     post_id: int,
     db: Session = Depends(deps.get_db),
     current_user: models.User = Depends(deps.get_current_user)
 ) -> Any:
-    """Like a post"""
-    post = db.query(models.Post).filter(models.Post.id == post_id).first()
-    if not post:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Post not found"
-        )
-    
-    # Check if already liked
-    like = db.query(models.Like).filter(
-        models.Like.post_id == post_id,
-        models.Like.user_id == current_user.id
-    ).first()
-    
-    if like:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Post already liked"
-        )
-    
-    like = models.Like(post_id=post_id, user_id=current_user.id)
-    db.add(like)
-    db.commit()
-    db.refresh(post)
-    return post
+    """Like a post; liking it again is a no-op"""
+    return _set_like(db, post_id, current_user.id, True)
 
-@router.delete("/{post_id}/unlike", response_model=schemas.Post)
+@router.delete("/{post_id}/unlike", response_model=schemas.LikeStatus)
 def unlike_post(
     *,
     post_id: int,
     db: Session = Depends(deps.get_db),
     current_user: models.User = Depends(deps.get_current_user)
 ) -> Any:
-    """Unlike a post"""
-    post = db.query(models.Post).filter(models.Post.id == post_id).first()
-    if not post:
+    """Unlike a post; unliking a post that is not liked is a no-op"""
+    return _set_like(db, post_id, current_user.id, False)
+
+def _model_for(view: schemas.PostView, full: Any, summary: Any) -> Any:
+    # Serialize with the schema the view produces rather than the Union,
+    # which would try each member in turn
+    return summary if view == schemas.PostView.summary else full
+
+def _set_like(db: Session, post_id: int, user_id: int, liked: bool) -> dict:
+    write = crud.buffer_like if settings.LIKE_WRITE_BEHIND else crud.set_like
+    likes_count = write(db, post_id, user_id, liked)
+    if likes_count is None:
+        db.rollback()
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Post not found"
         )
-    
-    like = db.query(models.Like).filter(
-        models.Like.post_id == post_id,
-        models.Like.user_id == current_user.id
-    ).first()
-    
-    if not like:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Post not liked"
-        )
-    
-    db.delete(like)
     db.commit()
-    db.refresh(post)
-    return post
+    return {"liked": liked, "likes_count": likes_count}
 
 @router.post("/{post_id}/comments", response_model=schemas.Comment)
 def create_comment(
@@ -280,27 +338,48 @@ def create_comment(
         )
     
     comment = models.Comment(
-        **comment_in.dict(),
+        **comment_in.dict(exclude={"post_id"}),
+        post_id=post_id,
         author_id=current_user.id
     )
     db.add(comment)
+    crud.adjust_post_counters(db, post_id, comments_count=1)
+    crud.record_engagement(
+        db, post_id, [(settings.TRENDING_COMMENT_WEIGHT, datetime.now(timezone.utc))]
+    )
     db.commit()
     db.refresh(comment)
     return comment
 
-@router.get("/{post_id}/comments", response_model=List[schemas.Comment])
+@router.get("/{post_id}/comments", response_model=schemas.CommentPage)
 def get_comments(
     *,
     post_id: int,
-    skip: int = 0,
-    limit: int = 50,
+    request: Request,
+    cursor: Optional[Cursor] = Depends(deps.get_cursor),
+    limit: int = Query(50, ge=1, le=100),
     db: Session = Depends(deps.get_db)
 ) -> Any:
-    """Get comments for a post"""
-    comments = db.query(models.Comment)\
-        .filter(models.Comment.post_id == post_id)\
-        .order_by(models.Comment.created_at.desc())\
-        .offset(skip)\
-        .limit(limit)\
-        .all()
-    return comments
\ No newline at end of file
+    """Get comments for a post, newest first, with cursor pagination"""
+    headers = {}
+    state = crud.comments_cache_state(db, post_id)
+    if state is not None and conditional.settled(*state[1:]):
+        last_modified = max((moment for moment in state[1:] if moment is not None), default=None)
+        headers = conditional.validator_headers(
+            conditional.make_etag("comments", post_id, *state),
+            last_modified
+        )
+        if conditional.is_not_modified(request.headers, headers["ETag"], last_modified):
+            return conditional.not_modified(headers)
+
+    comments, next_cursor = paginate(
+        db.query(models.Comment)\
+            .options(*crud.COMMENT_OPTIONS)\
+            .filter(models.Comment.post_id == post_id),
+        (models.Comment.created_at, models.Comment.id),
+        cursor,
+        limit
+    )
+    return serialization.render(
+        schemas.CommentPage, {"items": comments, "next_cursor": next_cursor}, headers
+    )
\ No newline at end of file
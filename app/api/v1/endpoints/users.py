@@ -1,19 +1,23 @@
 from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+import anyio
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Query, Request
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app import models, schemas
+from app import crud, models, schemas
 from app.api import deps
+from app.core import conditional, images, serialization
 from app.core.config import settings
-import os
-from PIL import Image
-import shutil
-from datetime import datetime
+from app.core.executors import PoolUnavailable
 
 router = APIRouter()
 
+# Everything schemas.UserWithFollowInfo serializes, read as one row
+PROFILE_COLUMNS = [getattr(models.User, name) for name in schemas.UserWithFollowInfo.model_fields]
+
 @router.get("/me", response_model=schemas.User)
 def read_user_me(
-    current_user: models.User = Depends(deps.get_current_user)
+    current_user: models.User = Depends(deps.get_current_user_fresh)
 ) -> Any:
     """Get current user"""
     return current_user
@@ -23,7 +27,7 @@ def update_user_me(
     *,
     db: Session = Depends(deps.get_db),
     user_in: schemas.UserUpdate,
-    current_user: models.User = Depends(deps.get_current_user)
+    current_user: models.User = Depends(deps.get_current_user_fresh)
 ) -> Any:
     """Update own user profile"""
     if user_in.email and user_in.email != current_user.email:
@@ -45,15 +49,27 @@ def update_user_me(
     
     db.add(current_user)
     db.commit()
+    deps.invalidate_user_cache(current_user.id)
     db.refresh(current_user)
     return current_user
 
+def _replace_profile_picture(db: Session, user: models.User, profile_picture: str) -> models.User:
+    previous_picture = user.profile_picture
+    user.profile_picture = profile_picture
+    db.add(user)
+    db.commit()
+    deps.invalidate_user_cache(user.id)
+    if previous_picture != profile_picture:
+        crud.collect_media(db, [previous_picture])
+    db.refresh(user)
+    return user
+
 @router.post("/me/profile-picture", response_model=schemas.User)
 async def upload_profile_picture(
     *,
     db: Session = Depends(deps.get_db),
     file: UploadFile = File(...),
-    current_user: models.User = Depends(deps.get_current_user)
+    current_user: models.User = Depends(deps.get_current_user_fresh)
 ) -> Any:
     """Upload profile picture"""
     if file.content_type not in settings.ALLOWED_IMAGE_TYPES:
@@ -62,52 +78,74 @@ async def upload_profile_picture(
             detail="Invalid file type"
         )
     
-    # Create media directory if it doesn't exist
-    os.makedirs(settings.MEDIA_PATH, exist_ok=True)
-    
-    # Generate unique filename
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = f"profile_{current_user.id}_{timestamp}.jpg"
-    file_path = os.path.join(settings.MEDIA_PATH, filename)
+    try:
+        data = await images.read_upload(file, settings.MAX_IMAGE_SIZE)
+    except images.ImageTooLarge:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail="Image too large"
+        )
     
+    # Decode, resize and store every rendition in the image worker pool
     try:
-        # Save and process image
-        with Image.open(file.file) as img:
-            # Resize image if needed
-            if img.height > 500 or img.width > 500:
-                img.thumbnail((500, 500))
-            img.save(file_path, "JPEG")
-        
-        # Update user profile
-        current_user.profile_picture = filename
-        db.add(current_user)
-        db.commit()
-        db.refresh(current_user)
-        return current_user
-        
-    except Exception as e:
+        profile_picture = await images.image_pool.run_async(
+            images.render_image,
+            data,
+            images.PROFILE_RENDITIONS,
+            settings.MEDIA_PATH,
+            settings.IMAGE_WEBP
+        )
+    except PoolUnavailable:
+        raise
+    except Exception:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Could not process image"
         )
+    
+    # Update user profile; the session and the media store are blocking
+    return await anyio.to_thread.run_sync(
+        _replace_profile_picture, db, current_user, profile_picture
+    )
+
+# Declared before /{username}; "batch" is a reserved username, see schemas.user
+@router.get("/batch", response_model=schemas.UserBatch)
+async def get_users_batch(
+    usernames: List[str] = Query([], max_length=settings.BATCH_MAX_ITEMS),
+    db: AsyncSession = Depends(deps.get_async_db)
+) -> Any:
+    """Get many users by username in request order; unknown usernames are listed in missing"""
+    usernames = list(dict.fromkeys(usernames))
+    users = (await db.scalars(
+        select(models.User).where(models.User.username.in_(usernames))
+    )).all()
+    by_username = {user.username: user for user in users}
+    return serialization.render(schemas.UserBatch, {
+        "items": [by_username[name] for name in usernames if name in by_username],
+        "missing": [name for name in usernames if name not in by_username],
+    })
 
 @router.get("/{username}", response_model=schemas.UserWithFollowInfo)
-def get_user_by_username(
+async def get_user_by_username(
     username: str,
-    db: Session = Depends(deps.get_db)
+    request: Request,
+    db: AsyncSession = Depends(deps.get_async_db)
 ) -> Any:
     """Get user by username"""
-    user = db.query(models.User).filter(models.User.username == username).first()
+    user = (await db.execute(
+        select(*PROFILE_COLUMNS).where(models.User.username == username)
+    )).first()
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
     
-    # Add follower counts
-    setattr(user, 'followers_count', len(user.followers))
-    setattr(user, 'following_count', len(user.following))
-    return user
+    # The row is the whole representation, so its values are an exact validator
+    headers = conditional.validator_headers(conditional.make_etag("user", *user))
+    if conditional.is_not_modified(request.headers, headers["ETag"]):
+        return conditional.not_modified(headers)
+    return serialization.render(schemas.UserWithFollowInfo, user, headers)
 
 @router.post("/{username}/follow", response_model=schemas.User)
 def follow_user(
@@ -129,13 +167,13 @@ def follow_user(
             detail="Users cannot follow themselves"
         )
     
-    if user in current_user.following:
+    if not crud.follow(db, current_user.id, user.id):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Already following this user"
         )
     
-    current_user.following.append(user)
+    crud.backfill_timeline(db, current_user.id, user.id)
     db.commit()
     return user
 
@@ -153,12 +191,12 @@ def unfollow_user(
             detail="User not found"
         )
     
-    if user not in current_user.following:
+    if not crud.unfollow(db, current_user.id, user.id):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Not following this user"
         )
     
-    current_user.following.remove(user)
+    crud.remove_author_from_timeline(db, current_user.id, user.id)
     db.commit()
     return user
\ No newline at end of file
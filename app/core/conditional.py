@@ -0,0 +1,66 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Dict, Optional
+from starlette.datastructures import Headers
+from starlette.responses import Response
+
+# API responses may be stored but must be revalidated before every reuse
+CACHE_CONTROL = "no-cache"
+# Responses carrying per-viewer flags must not be shared between viewers
+PRIVATE_CACHE_CONTROL = "private, no-cache"
+
+def make_etag(*parts: Any) -> str:
+    """Strong ETag derived from the values a representation is built from"""
+    return f'"{hashlib.sha256(repr(parts).encode()).hexdigest()[:32]}"'
+
+def etag_matches(header: str, etag: str) -> bool:
+    tags = [tag.strip() for tag in header.split(",")]
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+def _utc(moment: datetime) -> datetime:
+    # SQLite hands back naive datetimes; CURRENT_TIMESTAMP is UTC
+    return moment if moment.tzinfo else moment.replace(tzinfo=timezone.utc)
+
+def settled(*moments: Optional[datetime]) -> bool:
+    """True if every timestamp lies in a second that has already ended.
+
+    Timestamps are stored to the second, so a validator derived from one
+    issued during that second could still match after a later change.
+    """
+    current_second = datetime.now(timezone.utc).replace(microsecond=0)
+    return all(moment is None or _utc(moment) < current_second for moment in moments)
+
+def is_not_modified(
+    request_headers: Headers,
+    etag: str,
+    last_modified: Optional[datetime] = None
+) -> bool:
+    """Evaluate If-None-Match, falling back to If-Modified-Since as RFC 9110 requires"""
+    if_none_match = request_headers.get("if-none-match")
+    if if_none_match is not None:
+        return etag_matches(if_none_match, etag)
+    if_modified_since = request_headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        return _utc(last_modified) <= _utc(since)
+    return False
+
+def validator_headers(
+    etag: str,
+    last_modified: Optional[datetime] = None,
+    cache_control: str = CACHE_CONTROL
+) -> Dict[str, str]:
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if cache_control == PRIVATE_CACHE_CONTROL:
+        headers["Vary"] = "Authorization"
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(_utc(last_modified), usegmt=True)
+    return headers
+
+def not_modified(headers: Dict[str, str]) -> Response:
+    """A 304 carrying the validators the full response would have had"""
+    return Response(status_code=304, headers=headers)
@@ -9,19 +9,81 @@ class Settings(BaseSettings):
     # Base Settings
     API_V1_STR: str = "/api/v1"
     PROJECT_NAME: str = "Social Media API"
+    BATCH_MAX_ITEMS: int = 200  # ids or usernames accepted by the batch endpoints
     
     # Security
     SECRET_KEY: str = os.getenv("SECRET_KEY")
     ALGORITHM: str = os.getenv("ALGORITHM", "HS256")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES"))
+    # Each process caches principals for this long; a change made through
+    # another worker shows up here within it, except on /users/me, which
+    # always reads the row. 0 disables the authenticated-user cache.
+    AUTH_CACHE_TTL_SECONDS: int = 60
+    AUTH_CACHE_MAX_ENTRIES: int = 10000
+    # bcrypt runs in its own process pool; logins beyond the queue get a 503
+    PASSWORD_HASH_WORKERS: int = os.cpu_count() or 1
+    PASSWORD_HASH_MAX_QUEUE: int = 16
     
     # Database
     DATABASE_URL: str = os.getenv("DATABASE_URL")
+    # SQLite pragmas applied to every new connection
+    SQLITE_JOURNAL_MODE: str = "WAL"  # readers no longer block the writer
+    SQLITE_SYNCHRONOUS: str = "NORMAL"  # fsync at checkpoints only; safe with WAL
+    SQLITE_MMAP_SIZE: int = 256 * 1024 * 1024
+    SQLITE_CACHE_SIZE: int = -64000  # negative means KiB, so 64MB per connection
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    # Connection pool for server databases (PostgreSQL)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_RECYCLE_SECONDS: int = 1800
     
     # Media
     MEDIA_PATH: str = os.getenv("MEDIA_PATH")
     ALLOWED_IMAGE_TYPES: set = {"image/jpeg", "image/png", "image/gif"}
     MAX_IMAGE_SIZE: int = 5 * 1024 * 1024  # 5MB
+    IMAGE_WORKERS: int = os.cpu_count() or 1
+    IMAGE_MAX_QUEUE: int = 32
+    IMAGE_WEBP: bool = False  # also write a .webp next to every JPEG rendition
+    MEDIA_GC_INTERVAL_SECONDS: int = 3600
+    MEDIA_GC_GRACE_SECONDS: int = 3600  # unreferenced files younger than this are kept
+
+    # Write-behind likes: intents are buffered per process and written in
+    # batches; up to one interval of likes is lost if the process dies. Needs
+    # a single server process (WEB_CONCURRENCY=1): other processes neither
+    # see the buffer nor order their writes against it
+    LIKE_WRITE_BEHIND: bool = False
+    LIKE_FLUSH_INTERVAL_SECONDS: float = 0.5
+    LIKE_FLUSH_BATCH_SIZE: int = 500  # rows per statement; a fuller buffer flushes early
+
+    # Observability
+    SLOW_QUERY_SECONDS: float = 0.1  # statements at least this slow are logged with parameters
+    N_PLUS_ONE_THRESHOLD: int = 10  # a statement run more often in one request is logged
+    # Set by gunicorn.conf.py: workers publish their metrics here so /metrics
+    # reports the whole server instead of whichever worker was scraped
+    METRICS_MULTIPROC_DIR: str = ""
+    METRICS_WRITE_INTERVAL_SECONDS: float = 5.0  # how stale other workers' values may be
+
+    # Background tasks: the global ones (trimming timelines, collecting media,
+    # pruning trending) run only in the process holding this file lock. Empty
+    # means one per database in the temp directory; processes on other hosts
+    # do not see it, so set those intervals to 0 on all hosts but one.
+    TASK_LOCK_PATH: str = ""
+
+    # Trending posts: engagement decays by half every half-life
+    TRENDING_HALF_LIFE_SECONDS: int = 6 * 3600
+    TRENDING_LIKE_WEIGHT: float = 1.0
+    TRENDING_COMMENT_WEIGHT: float = 3.0
+    TRENDING_MIN_SCORE: float = 0.05  # posts that decayed below this are pruned
+    TRENDING_PRUNE_INTERVAL_SECONDS: int = 600
+
+    # Full-text search (SQLite FTS5)
+    SEARCH_MAX_TERMS: int = 8  # words beyond this are ignored
+    SEARCH_MIN_PREFIX_LENGTH: int = 2  # shorter "ab*" terms match whole words only
+
+    # Home timelines
+    TIMELINE_MAX_LENGTH: int = 800
+    FANOUT_MAX_FOLLOWERS: int = 10000  # above this, followers read the author's posts directly
+    TIMELINE_TRIM_INTERVAL_SECONDS: int = 300
 
     class Config:
         case_sensitive = True
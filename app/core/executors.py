@@ -0,0 +1,156 @@
+import asyncio
+import importlib
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional, Sequence, Tuple
+from app.core import metrics
+
+class PoolUnavailable(Exception):
+    """Raised when a pool cannot run a task now; clients should retry later"""
+
+class PoolSaturated(PoolUnavailable):
+    """Raised when a bounded pool already has its maximum of pending tasks"""
+
+class PoolBroken(PoolUnavailable):
+    """Raised when a task's worker died again after restarting the pool"""
+
+def _timed(fn: Callable[..., Any], args: Tuple[Any, ...]) -> Tuple[float, float, Any]:
+    # Runs in the worker; CLOCK_MONOTONIC is shared by all processes on the host
+    started = time.monotonic()
+    result = fn(*args)
+    return started, time.monotonic(), result
+
+def _preload(modules: Sequence[str]) -> None:
+    for name in modules:
+        importlib.import_module(name)
+
+class BoundedProcessPool:
+    """A process pool with admission control and latency metrics.
+
+    At most ``max_workers + max_queue`` tasks may be running or waiting at
+    once; beyond that ``PoolSaturated`` is raised immediately instead of
+    letting callers pile up. With ``max_workers=0`` tasks run inline.
+    If a worker dies the executor is replaced and the task retried once.
+    Worker processes are spawned by ``start()`` or on first use, never at
+    import, so they are created after any server fork. ``preload`` names the
+    modules ``start()`` imports in every worker, typically the one defining
+    the functions the pool runs.
+    """
+
+    def __init__(self, name: str, max_workers: int, max_queue: int, preload: Sequence[str] = ()) -> None:
+        self.name = name
+        self.max_workers = max_workers
+        self.preload = tuple(preload)
+        self._slots = threading.BoundedSemaphore(max(max_workers, 1) + max_queue)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+        self.queue_wait = metrics.histogram(
+            f"{name}_queue_wait_seconds", f"Time {name} tasks wait for a worker"
+        )
+        self.task_time = metrics.histogram(
+            f"{name}_task_seconds", f"Time {name} tasks take to run"
+        )
+        self.rejected = metrics.counter(
+            f"{name}_rejected_total", f"{name} tasks rejected because the pool was saturated"
+        )
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+
+    def _discard(self, executor: ProcessPoolExecutor) -> None:
+        # A dead worker, e.g. killed for memory, breaks the executor for good;
+        # the next task gets a fresh one
+        with self._executor_lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False)
+
+    def start(self) -> None:
+        """Begin spawning every worker and importing ``preload`` in it now,
+        so the first task does not wait for either.
+
+        Does not wait for the workers to come up. Call it after any server
+        fork, e.g. from the application's lifespan.
+        """
+        if self.max_workers <= 0:
+            return
+        executor = self._get_executor()
+        # Each task submitted while no worker is idle spawns another one
+        for _ in range(self.max_workers):
+            executor.submit(_preload, self.preload)
+
+    def _submit(self, fn: Callable[..., Any], args: Tuple[Any, ...]) -> "Future[Any]":
+        if not self._slots.acquire(blocking=False):
+            self.rejected.inc()
+            raise PoolSaturated(self.name)
+
+        result: "Future[Any]" = Future()
+        submitted = time.monotonic()
+
+        executor = self._get_executor()
+
+        def done(inner: "Future[Tuple[float, float, Any]]") -> None:
+            self._slots.release()
+            error = inner.exception()
+            if error is not None:
+                if isinstance(error, BrokenProcessPool):
+                    self._discard(executor)
+                result.set_exception(error)
+                return
+            started, finished, value = inner.result()
+            self.queue_wait.observe(max(started - submitted, 0.0))
+            self.task_time.observe(finished - started)
+            result.set_result(value)
+
+        try:
+            inner = executor.submit(_timed, fn, args)
+        except BaseException as error:
+            self._slots.release()
+            if isinstance(error, BrokenProcessPool):
+                self._discard(executor)
+            raise
+        inner.add_done_callback(done)
+        return result
+
+    def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run ``fn(*args)`` in the pool and block until it finishes"""
+        if self.max_workers <= 0:
+            started, finished, value = _timed(fn, args)
+            self.task_time.observe(finished - started)
+            return value
+        try:
+            return self._submit(fn, args).result()
+        except BrokenProcessPool:
+            pass
+        try:
+            return self._submit(fn, args).result()
+        except BrokenProcessPool as error:
+            raise PoolBroken(self.name) from error
+
+    async def run_async(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run ``fn(*args)`` in the pool without blocking the event loop"""
+        if self.max_workers <= 0:
+            return await asyncio.get_running_loop().run_in_executor(None, self.run, fn, *args)
+        try:
+            return await asyncio.wrap_future(self._submit(fn, args))
+        except BrokenProcessPool:
+            pass
+        try:
+            return await asyncio.wrap_future(self._submit(fn, args))
+        except BrokenProcessPool as error:
+            raise PoolBroken(self.name) from error
+
+    def shutdown(self) -> None:
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
@@ -0,0 +1,86 @@
+import hashlib
+import io
+from typing import Dict
+from fastapi import UploadFile
+from PIL import Image
+from app.core import media
+from app.core.config import settings
+from app.core.executors import BoundedProcessPool
+
+# Longest edge in pixels of each rendition; "full" is the file stored on the
+# model and the others are stored next to it as "<key>_<name><size>.jpg"
+POST_RENDITIONS = {"full": 1080, "medium": 640, "thumb": 150}
+PROFILE_RENDITIONS = {"full": 500, "thumb": 96}
+
+def rendition_suffix(name: str, size: int) -> str:
+    # The size is part of the name: an image small enough to be stored
+    # unscaled has one key for every use, but its renditions can differ
+    return "" if name == "full" else f"_{name}{size}"
+
+# Suffixes of every rendition file, including those written before the size
+# was part of the name
+RENDITION_SUFFIXES = {
+    rendition_suffix(name, size)
+    for renditions in (POST_RENDITIONS, PROFILE_RENDITIONS)
+    for name, size in renditions.items()
+} - {""} | {"_medium", "_thumb"}
+
+image_pool = BoundedProcessPool(
+    "image",
+    max_workers=settings.IMAGE_WORKERS,
+    max_queue=settings.IMAGE_MAX_QUEUE,
+    preload=(__name__,)
+)
+
+class ImageTooLarge(Exception):
+    pass
+
+async def read_upload(file: UploadFile, max_size: int, chunk_size: int = 64 * 1024) -> bytes:
+    """Read an upload in chunks, giving up as soon as it exceeds ``max_size`` bytes"""
+    chunks, size = [], 0
+    while True:
+        chunk = await file.read(chunk_size)
+        if not chunk:
+            break
+        size += len(chunk)
+        if size > max_size:
+            raise ImageTooLarge()
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+def _encode(image: Image.Image, fmt: str, **options) -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, fmt, **options)
+    return buffer.getvalue()
+
+def render_image(
+    data: bytes,
+    renditions: Dict[str, int],
+    directory: str,
+    webp: bool = False
+) -> str:
+    """Decode an image once and store every rendition in the media store.
+
+    Runs in a worker process. JPEG input is decoded in draft mode straight
+    at the scale closest above the largest rendition, then each smaller
+    rendition is downscaled from the previous one. Files are keyed by the
+    SHA-256 of the full-size JPEG, so identical images are stored once.
+    Returns the stored path of the full-size rendition.
+    """
+    largest = max(renditions.values())
+    with Image.open(io.BytesIO(data)) as source:
+        source.draft("RGB", (largest, largest))
+        image = source.convert("RGB")
+
+    encoded = {}
+    for name, size in sorted(renditions.items(), key=lambda item: -item[1]):
+        image.thumbnail((size, size))
+        suffix = rendition_suffix(name, size)
+        encoded[(suffix, ".jpg")] = _encode(image, "JPEG", quality=85)
+        if webp:
+            encoded[(suffix, ".webp")] = _encode(image, "WEBP", quality=80)
+
+    key = hashlib.sha256(encoded[("", ".jpg")]).hexdigest()
+    for (suffix, extension), payload in encoded.items():
+        media.write_object(directory, media.content_path(key, suffix, extension), payload)
+    return media.content_path(key)
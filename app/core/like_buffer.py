@@ -0,0 +1,86 @@
+import threading
+from collections import defaultdict
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+Key = Tuple[int, int]  # (post_id, user_id)
+
+class LikeBuffer:
+    """Latest like/unlike intent per (post_id, user_id), waiting to be written.
+
+    Each entry keeps the intent and the baseline it was recorded against
+    (whether the like row exists once everything before it is written), so
+    the buffer can report how far each post's ``likes_count`` will move.
+    Intents taken by a flush stay visible until the flush is done or restored.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._pending: Dict[Key, Tuple[bool, bool]] = {}
+        self._inflight: Dict[Key, Tuple[bool, bool]] = {}
+        self._deltas: Dict[int, int] = defaultdict(int)
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def record(self, post_id: int, user_id: int, liked: bool, persisted: bool) -> int:
+        """Buffer an intent; ``persisted`` is whether the like row exists now.
+
+        Returns the post's pending ``likes_count`` delta including this intent.
+        """
+        key = (post_id, user_id)
+        with self._lock:
+            previous = self._pending.get(key)
+            if previous is not None:
+                baseline = previous[1]
+                self._deltas[post_id] -= previous[0] - baseline
+            elif key in self._inflight:
+                baseline = self._inflight[key][0]
+            else:
+                baseline = persisted
+            self._pending[key] = (liked, baseline)
+            self._deltas[post_id] += liked - baseline
+            return self._deltas[post_id]
+
+    def delta(self, post_id: int) -> int:
+        with self._lock:
+            return self._deltas.get(post_id, 0)
+
+    def overlay(self, user_id: int, post_ids: Iterable[int], liked_ids: Set[int]) -> Set[int]:
+        """Apply ``user_id``'s unwritten intents to the set of liked post ids"""
+        if not self._pending and not self._inflight:
+            return liked_ids
+        liked_ids = set(liked_ids)
+        with self._lock:
+            for post_id in post_ids:
+                entry = self._pending.get((post_id, user_id)) or self._inflight.get((post_id, user_id))
+                if entry is not None:
+                    (liked_ids.add if entry[0] else liked_ids.discard)(post_id)
+        return liked_ids
+
+    def take(self) -> Dict[Key, bool]:
+        """Move pending intents in flight and return them as key -> liked"""
+        with self._lock:
+            self._inflight, self._pending = self._pending, {}
+            return {key: liked for key, (liked, _) in self._inflight.items()}
+
+    def done(self) -> None:
+        """Forget the intents in flight once they are durable"""
+        with self._lock:
+            for (post_id, _), (liked, baseline) in self._inflight.items():
+                self._deltas[post_id] -= liked - baseline
+                if not self._deltas[post_id]:
+                    del self._deltas[post_id]
+            self._inflight = {}
+
+    def restore(self) -> None:
+        """Put the intents in flight back after a failed flush"""
+        with self._lock:
+            for key, (liked, baseline) in self._inflight.items():
+                newer: Optional[Tuple[bool, bool]] = self._pending.get(key)
+                # A newer intent was recorded against this one; rebase it on the
+                # original baseline, which leaves the combined delta unchanged
+                self._pending[key] = (newer[0] if newer else liked, baseline)
+            self._inflight = {}
+
+# Like intents accepted in write-behind mode and not yet written
+like_buffer = LikeBuffer()
@@ -0,0 +1,216 @@
+import hashlib
+import mimetypes
+import os
+import posixpath
+import re
+import tempfile
+from typing import Iterator, Optional, Tuple
+import anyio
+from starlette.datastructures import Headers
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+from app.core.cache import TTLCache
+from app.core.conditional import etag_matches
+from app.core.config import settings
+
+# Stored files never change under the same name, so clients may keep them forever
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# Content hashes keyed by (path, size, mtime), so a rewritten file gets a new entry
+_etags = TTLCache(maxsize=10000, ttl=24 * 3600)
+
+# Content-addressed objects are named by the SHA-256 of the full-size image,
+# plus a rendition suffix such as "_thumb150"
+STORE_NAME = re.compile(r"^(?P<key>[0-9a-f]{64})(?P<suffix>_[a-z]+[0-9]*)?\.[a-z]+$")
+# Uploads from before the store, directly in MEDIA_PATH
+LEGACY_NAME = re.compile(r"^(post|profile)_[0-9]+_[0-9]{8}_[0-9]{6}\.jpg$")
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+def content_path(key: str, suffix: str = "", extension: str = ".jpg") -> str:
+    """Location of a stored object relative to MEDIA_PATH.
+
+    Objects are fanned out over two directory levels so no directory grows
+    beyond a few hundred entries.
+    """
+    return posixpath.join(key[:2], key[2:4], f"{key}{suffix}{extension}")
+
+def is_stored_name(name: str) -> bool:
+    """Whether ``name`` is a path the app itself stores media under"""
+    directory, filename = posixpath.split(name)
+    match = STORE_NAME.match(filename)
+    if match:
+        key = match["key"]
+        return directory == posixpath.join(key[:2], key[2:4])
+    return not directory and LEGACY_NAME.match(filename) is not None
+
+def write_object(root: str, relative_path: str, data: bytes) -> None:
+    """Store ``data`` at ``relative_path`` unless an identical object exists.
+
+    Objects are immutable, so an existing file is only touched, which also
+    protects it from a concurrent garbage collection pass.
+    """
+    path = os.path.join(root, relative_path)
+    if os.path.exists(path):
+        os.utime(path)
+        return
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+def iter_stored_files(root: str) -> Iterator[str]:
+    """Relative paths of every file in the store and of legacy top-level uploads"""
+    def walk(relative: str, depth: int) -> Iterator[str]:
+        with os.scandir(os.path.join(root, relative)) as entries:
+            for entry in entries:
+                path = posixpath.join(relative, entry.name) if relative else entry.name
+                if entry.is_file():
+                    yield path
+                elif entry.is_dir() and depth < 2 and len(entry.name) == 2:
+                    yield from walk(path, depth + 1)
+
+    return walk("", 0)
+
+def resolve_path(filename: str) -> Optional[str]:
+    """Absolute path of a stored media file, or None if missing or outside MEDIA_PATH"""
+    root = os.path.realpath(settings.MEDIA_PATH)
+    path = os.path.realpath(os.path.join(root, filename))
+    if os.path.commonpath([root, path]) != root or not os.path.isfile(path):
+        return None
+    return path
+
+def _hash_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return f'"{digest.hexdigest()[:32]}"'
+
+async def file_etag(path: str, stat: os.stat_result) -> str:
+    """Strong ETag derived from the file's content hash, computed once per version"""
+    # Content-addressed names already identify the bytes
+    if STORE_NAME.match(os.path.basename(path)):
+        return f'"{os.path.splitext(os.path.basename(path))[0]}"'
+
+    key = (path, stat.st_size, stat.st_mtime_ns)
+    etag = _etags.get(key)
+    if etag is None:
+        etag = await anyio.to_thread.run_sync(_hash_file, path)
+        _etags.set(key, etag)
+    return etag
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """Parse a single ``bytes=`` range into inclusive offsets.
+
+    Returns None when the header should be ignored and the whole file sent
+    (unknown unit, multiple ranges, or an invalid spec such as ``bytes=5-3``).
+    Raises RangeNotSatisfiable only for a valid range that starts past the end
+    of the file, or a suffix range that selects no bytes.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, sep, last = spec.strip().partition("-")
+    if not sep or not (first or last):
+        return None
+    if (first and not first.isdigit()) or (last and not last.isdigit()):
+        return None
+    if not first:
+        suffix = int(last)
+        if suffix == 0 or size == 0:
+            raise RangeNotSatisfiable()
+        return max(size - suffix, 0), size - 1
+    start = int(first)
+    end = int(last) if last else size - 1
+    if last and end < start:
+        return None
+    if start >= size:
+        raise RangeNotSatisfiable()
+    return start, min(end, size - 1)
+
+class MediaFileResponse(Response):
+    """Serve a stored media file with validators and byte ranges.
+
+    Answers ``If-None-Match`` with 304 and a single ``Range`` with 206. The
+    body goes out via the server's ``zerocopysend`` (sendfile) or
+    ``pathsend`` extension when available, otherwise in chunks read off the
+    event loop.
+    """
+    chunk_size = 256 * 1024
+
+    def __init__(self, path: str, stat: os.stat_result, etag: str, request_headers: Headers, method: str) -> None:
+        self.path = path
+        self.offset = 0
+        self.length = stat.st_size
+        self.send_body = method != "HEAD"
+        headers = {
+            "etag": etag,
+            "cache-control": CACHE_CONTROL,
+            "accept-ranges": "bytes",
+        }
+        status_code = 200
+
+        if etag_matches(request_headers.get("if-none-match", ""), etag):
+            status_code, self.length, self.send_body = 304, 0, False
+        elif "range" in request_headers and request_headers.get("if-range", etag) == etag:
+            try:
+                byte_range = parse_range(request_headers["range"], stat.st_size)
+            except RangeNotSatisfiable:
+                byte_range = None
+                status_code, self.length, self.send_body = 416, 0, False
+                headers["content-range"] = f"bytes */{stat.st_size}"
+            if byte_range is not None:
+                start, end = byte_range
+                status_code, self.offset, self.length = 206, start, end - start + 1
+                headers["content-range"] = f"bytes {start}-{end}/{stat.st_size}"
+
+        if status_code != 304:
+            headers["content-length"] = str(self.length)
+        super().__init__(
+            status_code=status_code,
+            headers=headers,
+            media_type=mimetypes.guess_type(path)[0] or "application/octet-stream"
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({
+            "type": "http.response.start",
+            "status": self.status_code,
+            "headers": self.raw_headers,
+        })
+        if not self.send_body or self.length == 0:
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        extensions = scope.get("extensions", {})
+        if "http.response.zerocopysend" in extensions:
+            with open(self.path, "rb") as f:
+                await send({
+                    "type": "http.response.zerocopysend",
+                    "file": f,
+                    "offset": self.offset,
+                    "count": self.length,
+                })
+            return
+        if "http.response.pathsend" in extensions and self.status_code == 200:
+            await send({"type": "http.response.pathsend", "path": self.path})
+            return
+
+        remaining = self.length
+        async with await anyio.open_file(self.path, "rb") as f:
+            await f.seek(self.offset)
+            while remaining > 0:
+                chunk = await f.read(min(self.chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send({
+                    "type": "http.response.body",
+                    "body": chunk,
+                    "more_body": remaining > 0,
+                })
+        if remaining > 0:
+            await send({"type": "http.response.body", "body": b""})
@@ -0,0 +1,259 @@
+import bisect
+import json
+import math
+import os
+import tempfile
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# (name suffix, extra labels, value) of one exposition line
+Sample = Tuple[str, Dict[str, str], float]
+
+class _Metric:
+    """Base for metrics; with ``labelnames`` the metric is a family of children.
+
+    ``labels(*values)`` returns the child for one combination of label values,
+    creating it on first use. Children have the same type and no labels.
+    """
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], "_Metric"] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values: object) -> "_Metric":
+        key = tuple(str(value) for value in values)
+        if len(key) != len(self.labelnames):
+            raise ValueError(f"{self.name} takes labels {self.labelnames}, got {key}")
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._child())
+        return child
+
+    def _child(self) -> "_Metric":
+        return type(self)(self.name, self.documentation)
+
+    def children(self) -> List[Tuple[Tuple[str, ...], "_Metric"]]:
+        """``(label values, child)`` of every child created so far"""
+        return list(self._children.items())
+
+    def samples(self) -> List[Sample]:
+        raise NotImplementedError
+
+    def collect(self) -> Iterator[Sample]:
+        """Samples of this metric, or of every child with its labels added"""
+        if not self.labelnames:
+            yield from self.samples()
+            return
+        for values, child in self.children():
+            labels = dict(zip(self.labelnames, values))
+            for suffix, extra, value in child.samples():
+                yield suffix, {**labels, **extra}, value
+
+class Counter(_Metric):
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self) -> float:
+        return self._value
+
+    def samples(self) -> List[Sample]:
+        return [("", {}, self._value)]
+
+class Gauge(Counter):
+    type = "gauge"
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.inc(-amount)
+
+    def set(self, value: float) -> None:
+        with self._lock:
+            self._value = value
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+        labelnames: Sequence[str] = ()
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+
+    def _child(self) -> "Histogram":
+        return Histogram(self.name, self.documentation, self.buckets)
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+
+    def snapshot(self) -> Tuple[List[Tuple[float, int]], float, int]:
+        """Return cumulative ``(upper bound, count)`` pairs, the sum and the count"""
+        with self._lock:
+            counts = list(self._counts)
+            total = self._sum
+        cumulative, running = [], 0
+        for bound, count in zip(self.buckets + (float("inf"),), counts):
+            running += count
+            cumulative.append((bound, running))
+        return cumulative, total, running
+
+    def samples(self) -> List[Sample]:
+        cumulative, total, count = self.snapshot()
+        samples: List[Sample] = [
+            ("_bucket", {"le": _format_value(bound)}, running) for bound, running in cumulative
+        ]
+        samples.append(("_sum", {}, total))
+        samples.append(("_count", {}, count))
+        return samples
+
+# Every metric created through counter()/gauge()/histogram(), by name
+REGISTRY: Dict[str, _Metric] = {}
+
+def counter(name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+    return REGISTRY.setdefault(name, Counter(name, documentation, labelnames))
+
+def gauge(name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+    return REGISTRY.setdefault(name, Gauge(name, documentation, labelnames))
+
+def histogram(
+    name: str,
+    documentation: str,
+    buckets: Sequence[float] = DEFAULT_BUCKETS,
+    labelnames: Sequence[str] = ()
+) -> Histogram:
+    return REGISTRY.setdefault(name, Histogram(name, documentation, buckets, labelnames))
+
+# Content type of render()'s output
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+def _escape(value: str) -> str:
+    return value.replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+# Every metric's samples as plain data, by name:
+# {"type": ..., "help": ..., "samples": [[suffix, labels, value], ...]}
+Snapshot = Dict[str, Dict[str, Any]]
+
+def snapshot() -> Snapshot:
+    return {
+        name: {
+            "type": metric.type,
+            "help": metric.documentation,
+            "samples": [list(sample) for sample in metric.collect()]
+        }
+        for name, metric in REGISTRY.items()
+    }
+
+def _render(metrics: Snapshot) -> str:
+    lines = []
+    for name, metric in sorted(metrics.items()):
+        lines.append(f"# HELP {name} {_escape(metric['help'])}")
+        lines.append(f"# TYPE {name} {metric['type']}")
+        for suffix, labels, value in metric["samples"]:
+            label_text = ",".join(f'{key}="{_escape(label)}"' for key, label in labels.items())
+            lines.append(
+                f"{name}{suffix}{{{label_text}}} {_format_value(value)}"
+                if label_text else f"{name}{suffix} {_format_value(value)}"
+            )
+    return "\n".join(lines) + "\n"
+
+def render() -> str:
+    """Every registered metric in the Prometheus text exposition format"""
+    return _render(snapshot())
+
+# Multi-process servers: each worker publishes its snapshot as <pid>.json in
+# a shared directory and a scrape of any worker sums them all. Counters and
+# histograms of exited workers are kept as ARCHIVED<pid>.json, one file per
+# process so archiving never rewrites a shared file, and totals never go back.
+ARCHIVED = "archived-"
+
+def _read(path: str) -> Snapshot:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        # Gone since it was listed, e.g. archived
+        return {}
+
+def _write(path: str, metrics: Snapshot) -> None:
+    fd, temporary = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    with os.fdopen(fd, "w") as f:
+        json.dump(metrics, f)
+    os.replace(temporary, path)
+
+def _merge(into: Dict[str, Dict[str, Any]], metrics: Snapshot, pid: Optional[str]) -> None:
+    """Add ``metrics`` to ``into``; gauges get a ``pid`` label, or are dropped without one"""
+    for name, metric in metrics.items():
+        target = into.setdefault(name, {"type": metric["type"], "help": metric["help"], "samples": {}})
+        for suffix, labels, value in metric["samples"]:
+            if metric["type"] == "gauge":
+                if pid is None:
+                    continue
+                labels = {**labels, "pid": pid}
+            key = (suffix, tuple(sorted(labels.items())))
+            if key in target["samples"]:
+                target["samples"][key][2] += value
+            else:
+                target["samples"][key] = [suffix, labels, value]
+
+def _flatten(merged: Dict[str, Dict[str, Any]]) -> Snapshot:
+    return {name: {**metric, "samples": list(metric["samples"].values())} for name, metric in merged.items()}
+
+def write_snapshot(directory: str) -> None:
+    """Publish this process's metrics for ``render_directory()`` in the others"""
+    _write(os.path.join(directory, f"{os.getpid()}.json"), snapshot())
+
+def render_directory(directory: str) -> str:
+    """Like ``render()``, but summed over every process publishing to ``directory``.
+
+    This process contributes its live values, the others their last
+    snapshot. Gauges are not summed but reported per process, labelled
+    with its ``pid``.
+    """
+    own = str(os.getpid())
+    merged: Dict[str, Dict[str, Any]] = {}
+    _merge(merged, snapshot(), own)
+    for filename in sorted(os.listdir(directory)):
+        stem, extension = os.path.splitext(filename)
+        if extension != ".json" or stem == own:
+            continue
+        pid = None if stem.startswith(ARCHIVED) else stem
+        _merge(merged, _read(os.path.join(directory, filename)), pid)
+    return _render(_flatten(merged))
+
+def archive(directory: str, pid: int) -> None:
+    """Keep an exited process's counters and histograms and drop its gauges"""
+    path = os.path.join(directory, f"{pid}.json")
+    exited = _read(path)
+    if exited:
+        kept: Dict[str, Dict[str, Any]] = {}
+        _merge(kept, exited, None)
+        _write(os.path.join(directory, f"{ARCHIVED}{pid}.json"), _flatten(kept))
+    if os.path.exists(path):
+        os.remove(path)
@@ -0,0 +1,97 @@
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict
+from app.core import metrics
+from app.core.config import settings
+from app.db import instrumentation
+
+logger = logging.getLogger(__name__)
+
+Scope = Dict[str, Any]
+Message = Dict[str, Any]
+Receive = Callable[[], Awaitable[Message]]
+Send = Callable[[Message], Awaitable[None]]
+
+in_flight = metrics.gauge(
+    "http_requests_in_flight", "Requests currently being handled"
+)
+requests_total = metrics.counter(
+    "http_requests_total", "Requests handled", ("method", "route", "status")
+)
+request_time = metrics.histogram(
+    "http_request_duration_seconds", "Time to handle a request", labelnames=("method", "route")
+)
+response_size = metrics.histogram(
+    "http_response_size_bytes",
+    "Size of response bodies",
+    (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304),
+    ("method", "route")
+)
+request_statements = metrics.histogram(
+    "http_request_db_statements",
+    "SQL statements executed per request",
+    (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89),
+    ("method", "route")
+)
+request_db_time = metrics.histogram(
+    "http_request_db_seconds", "Time spent in SQL per request", labelnames=("method", "route")
+)
+repeated_statements = metrics.counter(
+    "http_requests_repeated_statements_total",
+    "Requests that ran one statement more than N_PLUS_ONE_THRESHOLD times",
+    ("method", "route")
+)
+
+class MetricsMiddleware:
+    """Record latency, size, status and SQL usage of every HTTP request.
+
+    Plain ASGI rather than ``BaseHTTPMiddleware``: the response is passed
+    through untouched and the request stays in the caller's task, so the SQL
+    hooks see this request's ``RequestStats``. Requests are labelled with the
+    route template, e.g. ``/api/v1/posts/{post_id}``, or "unmatched".
+    """
+
+    def __init__(self, app: Callable[[Scope, Receive, Send], Awaitable[None]]) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # An exception escaping the app becomes a 500 further out
+        status = 500
+        size = 0
+
+        async def send_and_measure(message: Message) -> None:
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        in_flight.inc()
+        started = time.perf_counter()
+        with instrumentation.track_request() as stats:
+            try:
+                await self.app(scope, receive, send_and_measure)
+            finally:
+                in_flight.dec()
+                elapsed = time.perf_counter() - started
+                method = scope["method"]
+                route = getattr(scope.get("route"), "path", "unmatched")
+                requests_total.labels(method, route, status).inc()
+                request_time.labels(method, route).observe(elapsed)
+                response_size.labels(method, route).observe(size)
+                request_statements.labels(method, route).observe(stats.statements)
+                request_db_time.labels(method, route).observe(stats.db_time)
+
+                repeated = stats.repeated(settings.N_PLUS_ONE_THRESHOLD)
+                if repeated:
+                    repeated_statements.labels(method, route).inc()
+                    statement, count = repeated[0]
+                    logger.warning(
+                        "Possible N+1 in %s %s: statement ran %d times: %s",
+                        method, route, count, statement
+                    )
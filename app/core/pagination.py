@@ -0,0 +1,63 @@
+import base64
+from datetime import datetime
+from typing import Any, List, Optional, Sequence, Tuple
+
+from sqlalchemy import tuple_
+
+Cursor = Tuple[datetime, int]
+# (relevance, id) position in a ranked search; lower ranks come first
+RankCursor = Tuple[float, int]
+
+def encode_cursor(created_at: datetime, id: int) -> str:
+    """Encode a ``(created_at, id)`` position as an opaque cursor string"""
+    raw = f"{created_at.isoformat()}|{id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Optional[Cursor]:
+    """Decode a cursor produced by ``encode_cursor``, or None if malformed"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, id = raw.decode().split("|")
+        return datetime.fromisoformat(created_at), int(id)
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+def encode_rank_cursor(rank: float, id: int) -> str:
+    """Encode a ``(rank, id)`` search position as an opaque cursor string"""
+    raw = f"{rank!r}|{id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_rank_cursor(cursor: str) -> Optional[RankCursor]:
+    """Decode a cursor produced by ``encode_rank_cursor``, or None if malformed"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        rank, id = raw.decode().split("|")
+        return float(rank), int(id)
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+def paginate(
+    query: Any,
+    columns: Sequence[Any],
+    cursor: Optional[Cursor],
+    limit: int
+) -> Tuple[List[Any], Optional[str]]:
+    """Return one newest-first keyset page of ``query`` and the next cursor.
+
+    ``columns`` is the ``(timestamp, id)`` pair the listing is ordered by.
+    Rows are filtered with a row-value comparison instead of OFFSET, so every
+    page is an index range scan and rows inserted while a client scrolls do
+    not shift later pages.
+    """
+    if cursor is not None:
+        query = query.filter(tuple_(*columns) < cursor)
+    rows = query.order_by(*(column.desc() for column in columns))\
+        .limit(limit + 1)\
+        .all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(*(getattr(last, column.key) for column in columns))
+    return rows, next_cursor
@@ -3,15 +3,37 @@ from typing import Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from app.core.config import settings
+from app.core.executors import BoundedProcessPool
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
+# bcrypt is CPU bound; keep it off the request threadpool and cap its backlog
+hash_pool = BoundedProcessPool(
+    "password_hash",
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE,
+    preload=(__name__,)
+)
+
+def _verify(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
-def get_password_hash(password: str) -> str:
+def _hash(password: str) -> str:
     return pwd_context.hash(password)
 
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return hash_pool.run(_verify, plain_password, hashed_password)
+
+def get_password_hash(password: str) -> str:
+    return hash_pool.run(_hash, password)
+
+# Request handlers use these: waiting for the pool then holds no thread
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await hash_pool.run_async(_verify, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    return await hash_pool.run_async(_hash, password)
+
 def create_access_token(subject: int, expires_delta: Optional[timedelta] = None) -> str:
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
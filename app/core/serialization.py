@@ -0,0 +1,31 @@
+from functools import lru_cache
+from typing import Any, Mapping, Optional
+from pydantic import TypeAdapter
+from starlette.responses import Response
+
+@lru_cache(maxsize=None)
+def adapter_for(model: Any) -> TypeAdapter:
+    """TypeAdapter for a response model, built once per model"""
+    return TypeAdapter(model)
+
+def dump(model: Any, content: Any) -> bytes:
+    """Validate ``content`` (dicts, rows or ORM objects) as ``model`` and encode it as JSON.
+
+    Gives the same bytes as FastAPI's ``response_model`` handling, but encodes
+    in pydantic-core instead of going through ``jsonable_encoder`` and ``json``.
+    """
+    adapter = adapter_for(model)
+    return adapter.dump_json(adapter.validate_python(content, from_attributes=True))
+
+def render(
+    model: Any,
+    content: Any,
+    headers: Optional[Mapping[str, str]] = None
+) -> Response:
+    """JSON response for ``content`` serialized as ``model``.
+
+    Endpoints returning this keep their ``response_model`` so OpenAPI still
+    documents the schema. Headers set on an injected ``Response`` are not
+    applied to a returned one, so pass them here.
+    """
+    return Response(dump(model, content), media_type="application/json", headers=headers)
@@ -0,0 +1,122 @@
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+from typing import Callable, Dict, IO, List, Optional
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db.session import SessionLocal
+
+try:
+    import fcntl
+except ImportError:  # Windows: no preforked server, so no other process to defer to
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+_stop = threading.Event()
+_threads: List[threading.Thread] = []
+_wakeups: Dict[str, threading.Event] = {}
+
+# Open while this process holds the exclusive task lock
+_lock_file: Optional[IO[str]] = None
+_lock_guard = threading.Lock()
+
+def lock_path() -> str:
+    """File whose holder runs the exclusive tasks; one per database by default"""
+    if settings.TASK_LOCK_PATH:
+        return settings.TASK_LOCK_PATH
+    digest = hashlib.sha1(settings.DATABASE_URL.encode()).hexdigest()[:12]
+    return os.path.join(tempfile.gettempdir(), f"social-media-api-tasks-{digest}.lock")
+
+def _hold_lock() -> bool:
+    """Whether this process holds the task lock, taking it if it is free.
+
+    Once taken it is kept until ``stop_periodic()`` or the process exits, so
+    the other processes retry on each tick and one of them takes over.
+    """
+    global _lock_file
+    if fcntl is None:
+        return True
+    with _lock_guard:
+        if _lock_file is None:
+            handle = open(lock_path(), "a")
+            try:
+                fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                handle.close()
+                return False
+            _lock_file = handle
+            logger.info("Process %d runs the exclusive periodic tasks", os.getpid())
+        return True
+
+def _release_lock() -> None:
+    global _lock_file
+    with _lock_guard:
+        if _lock_file is not None:
+            _lock_file.close()
+            _lock_file = None
+
+def _run(
+    name: str,
+    interval: float,
+    job: Callable[[Session], object],
+    wakeup: threading.Event,
+    exclusive: bool
+) -> None:
+    while True:
+        wakeup.wait(interval)
+        wakeup.clear()
+        if _stop.is_set():
+            return
+        if exclusive and not _hold_lock():
+            continue
+        db = SessionLocal()
+        try:
+            job(db)
+            db.commit()
+        except Exception:
+            db.rollback()
+            logger.exception("Periodic task %s failed", name)
+        finally:
+            db.close()
+
+def start_periodic(
+    name: str,
+    interval: float,
+    job: Callable[[Session], object],
+    exclusive: bool = False
+) -> None:
+    """Run ``job(db)`` every ``interval`` seconds in a daemon thread, committing after each run.
+
+    An ``exclusive`` job works on shared state, like the whole database or
+    media store, and runs in only one of the server's processes at a time:
+    whichever holds the lock at ``lock_path()``.
+    """
+    if interval <= 0:
+        return
+    _stop.clear()
+    wakeup = _wakeups[name] = threading.Event()
+    thread = threading.Thread(
+        target=_run, args=(name, interval, job, wakeup, exclusive), name=name, daemon=True
+    )
+    thread.start()
+    _threads.append(thread)
+
+def wake(name: str) -> None:
+    """Run a periodic task now instead of waiting for its next tick"""
+    wakeup = _wakeups.get(name)
+    if wakeup is not None:
+        wakeup.set()
+
+def stop_periodic() -> None:
+    _stop.set()
+    for wakeup in _wakeups.values():
+        wakeup.set()
+    for thread in _threads:
+        thread.join()
+    _threads.clear()
+    _wakeups.clear()
+    # Let another process take over the exclusive tasks right away
+    _release_lock()
@@ -0,0 +1,44 @@
+import math
+from datetime import datetime, timezone
+from typing import Iterable, Optional, Tuple
+
+# Scores grow by one half-life's worth per half-life after this moment; any
+# fixed instant works, a recent one keeps the stored numbers small
+EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+# (weight, when) of one engagement; a negative weight takes one back
+Event = Tuple[float, datetime]
+
+def _growth(at: datetime, half_life: float) -> float:
+    if at.tzinfo is None:
+        at = at.replace(tzinfo=timezone.utc)
+    return (at - EPOCH).total_seconds() * math.log(2) / half_life
+
+def event_key(weight: float, at: datetime, half_life: float) -> float:
+    """Log-space score of one engagement of positive ``weight`` at ``at``"""
+    return math.log(weight) + _growth(at, half_life)
+
+def combine(score: Optional[float], events: Iterable[Event], half_life: float) -> Optional[float]:
+    """Add ``events`` to a log-space ``score`` (None for no score yet).
+
+    Works relative to the largest term so nothing overflows. Returns None
+    once nothing is left, e.g. after the only like was taken back.
+    """
+    terms = [(1.0, score)] if score is not None else []
+    terms += [
+        (math.copysign(1.0, weight), event_key(abs(weight), at, half_life))
+        for weight, at in events
+        if weight
+    ]
+    if not terms:
+        return score
+    top = max(key for _, key in terms)
+    total = sum(sign * math.exp(key - top) for sign, key in terms)
+    # Rounding can leave a hair above zero after exact cancellation
+    if total <= 1e-9:
+        return None
+    return top + math.log(total)
+
+def score_floor(min_score: float, now: datetime, half_life: float) -> float:
+    """Log-space score of a post whose decayed score is ``min_score`` at ``now``"""
+    return event_key(min_score, now, half_life)
@@ -0,0 +1,35 @@
+# Make crud directory a Python package
+from .follow import follow, reconcile_follow_counts, unfollow
+from .like import FLUSH_TASK, buffer_like, flush_likes, set_like
+from .media import collect_media, referenced_images
+from .post import (
+    COMMENT_OPTIONS,
+    COMMENT_PREVIEW_SIZE,
+    POST_OPTIONS,
+    add_pending_likes,
+    adjust_post_counters,
+    build_post_summaries,
+    feed_page,
+    get_post,
+    get_post_for_viewer,
+    get_post_summary,
+    get_posts_batch,
+    list_posts,
+    order_by_ids,
+    post_summary_query,
+    posts_by_ids,
+    reconcile_post_counters,
+)
+from .search import search_posts
+from .trending import PRUNE_TASK, prune_trending, record_engagement, remove_post_from_trending, trending_page
+from .validators import comments_cache_state, post_cache_state
+from .viewer_state import VIEWER_FLAGS, attach_viewer_state, resolve_viewer_state
+from .timeline import (
+    backfill_timeline,
+    fan_out_post,
+    read_timeline,
+    rebuild_timelines,
+    remove_author_from_timeline,
+    remove_post_from_timelines,
+    trim_timelines,
+)
@@ -0,0 +1,67 @@
+from typing import Iterable, Optional
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import Session
+from app.db.dml import insert_ignore
+from app.models.user import User, followers
+
+def _adjust_follow_counts(db: Session, follower_id: int, followed_id: int, delta: int) -> None:
+    # One UPDATE for both rows; updated_at is pinned as with post counters
+    db.query(User)\
+        .filter(User.id.in_([follower_id, followed_id]))\
+        .update(
+            {
+                User.following_count: User.following_count
+                    + case((User.id == follower_id, delta), else_=0),
+                User.followers_count: User.followers_count
+                    + case((User.id == followed_id, delta), else_=0),
+                User.updated_at: User.updated_at,
+            },
+            synchronize_session=False
+        )
+
+def follow(db: Session, follower_id: int, followed_id: int) -> bool:
+    """Add a follow edge and bump both counters; False if it already existed"""
+    if not insert_ignore(db, followers, follower_id=follower_id, followed_id=followed_id):
+        return False
+    _adjust_follow_counts(db, follower_id, followed_id, 1)
+    return True
+
+def unfollow(db: Session, follower_id: int, followed_id: int) -> bool:
+    """Remove a follow edge and decrement both counters; False if there was none"""
+    deleted = db.execute(
+        followers.delete().where(
+            followers.c.follower_id == follower_id,
+            followers.c.followed_id == followed_id
+        )
+    ).rowcount
+    if not deleted:
+        return False
+    _adjust_follow_counts(db, follower_id, followed_id, -1)
+    return True
+
+def reconcile_follow_counts(db: Session, user_ids: Optional[Iterable[int]] = None) -> int:
+    """Recompute ``followers_count`` and ``following_count`` from ``followers``.
+
+    Single UPDATE with correlated counts, over every user or only
+    ``user_ids``. Returns the number of users touched; the caller commits.
+    """
+    followers_count = select(func.count())\
+        .select_from(followers)\
+        .where(followers.c.followed_id == User.id)\
+        .scalar_subquery()
+    following_count = select(func.count())\
+        .select_from(followers)\
+        .where(followers.c.follower_id == User.id)\
+        .scalar_subquery()
+
+    query = db.query(User)
+    if user_ids is not None:
+        query = query.filter(User.id.in_(list(user_ids)))
+    return query.update(
+        {
+            User.followers_count: followers_count,
+            User.following_count: following_count,
+            User.updated_at: User.updated_at,
+        },
+        synchronize_session=False
+    )
@@ -0,0 +1,116 @@
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+from sqlalchemy import delete, exists, literal, select, tuple_
+from sqlalchemy.orm import Session
+from app.core import tasks, trending
+from app.core.config import settings
+from app.core.like_buffer import like_buffer
+from app.db.dml import insert_ignore_from_select, insert_ignore_many
+from app.models.post import Like, Post
+from .post import adjust_post_counters
+from .trending import record_engagement
+
+FLUSH_TASK = "flush-likes"
+
+def set_like(db: Session, post_id: int, user_id: int, liked: bool) -> Optional[int]:
+    """Make ``user_id``'s like of a post match ``liked``, idempotently.
+
+    The like row is inserted (skipping duplicates, and only if the post exists)
+    or deleted; the counter and trending score move only when a row actually
+    changed. Returns the post's ``likes_count``, or None if there is no such post. The
+    caller commits, or rolls back on None.
+    """
+    weight = settings.TRENDING_LIKE_WEIGHT
+    if liked:
+        changed = insert_ignore_from_select(
+            db,
+            Like,
+            ["post_id", "user_id"],
+            select(Post.id, literal(user_id)).where(Post.id == post_id)
+        )
+        events = [(weight, datetime.now(timezone.utc))]
+    else:
+        # Take back what the like added when it was made, not a like made now
+        events = [(-weight, liked_at) for liked_at in db.execute(
+            delete(Like)
+                .where(Like.post_id == post_id, Like.user_id == user_id)
+                .returning(Like.created_at)
+                .execution_options(synchronize_session=False)
+        ).scalars()]
+        changed = len(events)
+
+    if changed:
+        counters = adjust_post_counters(db, post_id, likes_count=1 if liked else -1)
+        record_engagement(db, post_id, events)
+    else:
+        counters = db.query(Post.likes_count).filter(Post.id == post_id).first()
+    return counters.likes_count if counters else None
+
+def buffer_like(db: Session, post_id: int, user_id: int, liked: bool) -> Optional[int]:
+    """Write-behind ``set_like``: record the intent and return without writing.
+
+    Costs one read. Returns ``likes_count`` including unwritten intents, or
+    None if there is no such post. A full buffer wakes the flusher early.
+    """
+    row = db.query(
+        Post.likes_count,
+        exists().where(Like.post_id == Post.id, Like.user_id == user_id)
+    ).filter(Post.id == post_id).first()
+    if row is None:
+        return None
+    likes_count, persisted = row
+    delta = like_buffer.record(post_id, user_id, liked, persisted)
+    if len(like_buffer) >= settings.LIKE_FLUSH_BATCH_SIZE:
+        tasks.wake(FLUSH_TASK)
+    return likes_count + delta
+
+def flush_likes(db: Session) -> int:
+    """Write buffered like intents in batched statements; returns intents flushed.
+
+    Likes are multi-row INSERT ... ON CONFLICT DO NOTHING and unlikes are
+    multi-row DELETEs, both returning the rows they changed, so counters move
+    by exactly what was written. Commits itself, since the buffer may only
+    forget the intents once they are durable; on failure they are put back.
+    """
+    intents = like_buffer.take()
+    if not intents:
+        return 0
+    try:
+        post_ids = {post_id for post_id, _ in intents}
+        existing = {id for id, in db.query(Post.id).filter(Post.id.in_(post_ids))}
+        likes = [key for key, liked in intents.items() if liked and key[0] in existing]
+        unlikes = [key for key, liked in intents.items() if not liked]
+
+        deltas: Counter = Counter()
+        events: Dict[int, List[trending.Event]] = defaultdict(list)
+        weight = settings.TRENDING_LIKE_WEIGHT
+        now = datetime.now(timezone.utc)
+        size = settings.LIKE_FLUSH_BATCH_SIZE
+        for start in range(0, len(likes), size):
+            rows = [{"post_id": post_id, "user_id": user_id} for post_id, user_id in likes[start:start + size]]
+            for post_id in insert_ignore_many(db, Like, rows, Like.post_id):
+                deltas[post_id] += 1
+                events[post_id].append((weight, now))
+        for start in range(0, len(unlikes), size):
+            for post_id, liked_at in db.execute(
+                delete(Like)
+                    .where(tuple_(Like.post_id, Like.user_id).in_(unlikes[start:start + size]))
+                    .returning(Like.post_id, Like.created_at)
+                    .execution_options(synchronize_session=False)
+            ):
+                deltas[post_id] -= 1
+                events[post_id].append((-weight, liked_at))
+
+        for post_id, delta in deltas.items():
+            if delta:
+                adjust_post_counters(db, post_id, likes_count=delta)
+        for post_id, post_events in events.items():
+            record_engagement(db, post_id, post_events)
+        db.commit()
+    except Exception:
+        db.rollback()
+        like_buffer.restore()
+        raise
+    like_buffer.done()
+    return len(intents)
@@ -0,0 +1,79 @@
+import os
+import posixpath
+import time
+from typing import Dict, Iterable, List, Optional, Set
+from sqlalchemy.orm import Session
+from app.core import media
+from app.core.config import settings
+from app.core.images import RENDITION_SUFFIXES
+from app.models.post import Post
+from app.models.user import User
+
+_EXTENSIONS = (".jpg", ".webp")
+
+def _image_name(path: str) -> str:
+    # Map a rendition file back to the full-size name stored on the models
+    directory, filename = posixpath.split(path)
+    stem = os.path.splitext(filename)[0]
+    for suffix in RENDITION_SUFFIXES:
+        if stem.endswith(suffix):
+            stem = stem[:-len(suffix)]
+            break
+    return posixpath.join(directory, f"{stem}.jpg")
+
+def _image_files(name: str) -> List[str]:
+    stem = os.path.splitext(name)[0]
+    suffixes = [""] + sorted(RENDITION_SUFFIXES)
+    candidates = [stem + suffix + extension for suffix in suffixes for extension in _EXTENSIONS]
+    return [path for path in candidates if os.path.exists(os.path.join(settings.MEDIA_PATH, path))]
+
+def referenced_images(db: Session, names: Iterable[str], batch_size: int = 500) -> Set[str]:
+    """The subset of ``names`` still referenced by a post image or a profile picture"""
+    names = list(names)
+    referenced: Set[str] = set()
+    for start in range(0, len(names), batch_size):
+        batch = names[start:start + batch_size]
+        rows = db.query(Post.image_url)\
+            .filter(Post.image_url.in_(batch))\
+            .union(db.query(User.profile_picture).filter(User.profile_picture.in_(batch)))\
+            .all()
+        referenced.update(name for name, in rows)
+    return referenced
+
+def collect_media(db: Session, names: Optional[Iterable[str]] = None) -> int:
+    """Delete stored images, with their renditions, that nothing references.
+
+    With ``names`` only those images are checked, e.g. right after a post or
+    picture that used them went away; otherwise the whole store is swept.
+    Files written or deduplicated within ``MEDIA_GC_GRACE_SECONDS`` are kept
+    so an upload that is not committed yet is never collected. Returns the
+    number of files removed.
+    """
+    # Only names the store itself hands out: references may be rows written
+    # before clients were stopped from setting them, and may hold anything
+    if names is None:
+        files = [path for path in media.iter_stored_files(settings.MEDIA_PATH) if media.is_stored_name(path)]
+    else:
+        files = [path for name in names if name and media.is_stored_name(name) for path in _image_files(name)]
+
+    images: Dict[str, List[str]] = {}
+    for path in files:
+        images.setdefault(_image_name(path), []).append(path)
+    referenced = referenced_images(db, images)
+
+    cutoff = time.time() - settings.MEDIA_GC_GRACE_SECONDS
+    removed = 0
+    for name, paths in images.items():
+        if name in referenced:
+            continue
+        for path in paths:
+            full_path = media.resolve_path(path)
+            if full_path is None:
+                continue
+            try:
+                if os.stat(full_path).st_mtime < cutoff:
+                    os.remove(full_path)
+                    removed += 1
+            except FileNotFoundError:
+                pass
+    return removed
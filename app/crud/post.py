@@ -0,0 +1,270 @@
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+from sqlalchemy import func, select, union_all, update
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Query, Session, joinedload, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
+from app.models.post import Post, Comment, Like
+from app.models.user import User
+from app.core.like_buffer import like_buffer
+from app.core.pagination import Cursor, paginate
+from .timeline import read_timeline
+from .viewer_state import attach_viewer_state, resolve_viewer_state
+
+# Loader options matching what each response schema serializes, so building a
+# response never falls back to per-row lazy loads.
+COMMENT_OPTIONS = (
+    joinedload(Comment.author),
+)
+POST_OPTIONS = (
+    joinedload(Post.author),
+    selectinload(Post.comments).joinedload(Comment.author),
+    selectinload(Post.likes).joinedload(Like.user),
+)
+
+def get_post(db: Session, post_id: int) -> Optional[Post]:
+    """Load a post together with everything ``schemas.Post`` serializes"""
+    return db.query(Post)\
+        .options(*POST_OPTIONS)\
+        .filter(Post.id == post_id)\
+        .populate_existing()\
+        .first()
+
+def add_pending_likes(posts: Sequence[Post]) -> None:
+    """Count write-behind likes that are not written yet in ``likes_count``"""
+    for post in posts:
+        delta = like_buffer.delta(post.id)
+        if delta:
+            # As loaded state, so the session never writes the sum back
+            set_committed_value(post, "likes_count", post.likes_count + delta)
+
+def order_by_ids(items: Sequence[Any], ids: Sequence[int]) -> List[Any]:
+    """Return ``items`` in the order of ``ids``, skipping ids with no item"""
+    by_id = {item.id: item for item in items}
+    return [by_id[id] for id in ids if id in by_id]
+
+def adjust_post_counters(db: Session, post_id: int, **deltas: int) -> Optional[Row]:
+    """Add ``deltas`` to a post's persisted counters in the current transaction.
+
+    The increment is done in SQL so concurrent writers never lose updates.
+    ``updated_at`` is pinned because engagement is not an edit of the post.
+    Returns the new values of the adjusted counters, or None if there is no
+    such post.
+    """
+    columns = [getattr(Post, name) for name in deltas]
+    values = {column: column + delta for column, delta in zip(columns, deltas.values())}
+    values[Post.updated_at] = Post.updated_at
+    return db.execute(
+        update(Post)
+            .where(Post.id == post_id)
+            .values(values)
+            .returning(*columns)
+            .execution_options(synchronize_session=False)
+    ).first()
+
+def reconcile_post_counters(db: Session, post_ids: Optional[Iterable[int]] = None) -> int:
+    """Recompute ``likes_count`` and ``comments_count`` from the child tables.
+
+    Runs as a single UPDATE with correlated counts, over every post or only
+    ``post_ids``. Returns the number of posts touched; the caller commits.
+    """
+    likes = select(func.count(Like.id))\
+        .where(Like.post_id == Post.id)\
+        .scalar_subquery()
+    comments = select(func.count(Comment.id))\
+        .where(Comment.post_id == Post.id)\
+        .scalar_subquery()
+
+    query = db.query(Post)
+    if post_ids is not None:
+        query = query.filter(Post.id.in_(list(post_ids)))
+    return query.update(
+        {
+            Post.likes_count: likes,
+            Post.comments_count: comments,
+            Post.updated_at: Post.updated_at,
+        },
+        synchronize_session=False
+    )
+
+
+# Number of most recent comments embedded in a post summary
+COMMENT_PREVIEW_SIZE = 3
+
+def post_summary_query(db: Session) -> Query:
+    """Column-only query for post summaries; filter and paginate it like ``Post``"""
+    return db.query(
+        Post.id,
+        Post.content,
+        Post.image_url,
+        Post.author_id,
+        Post.created_at,
+        Post.updated_at,
+        Post.likes_count,
+        Post.comments_count,
+        User.username.label("author_username"),
+        User.full_name.label("author_full_name"),
+        User.profile_picture.label("author_profile_picture"),
+    ).join(User, User.id == Post.author_id)
+
+def _comment_previews(db: Session, post_ids: Sequence[int]) -> Dict[int, List[Dict[str, Any]]]:
+    # One index range scan of at most COMMENT_PREVIEW_SIZE rows per post,
+    # combined with UNION ALL so a heavily commented post costs no more.
+    branches = [
+        select(
+            Comment.id,
+            Comment.post_id,
+            Comment.content,
+            Comment.author_id,
+            Comment.created_at,
+            User.username.label("author_username"),
+            User.full_name.label("author_full_name"),
+            User.profile_picture.label("author_profile_picture"),
+        )
+        .join(User, User.id == Comment.author_id)
+        .where(Comment.post_id == post_id)
+        .order_by(Comment.created_at.desc(), Comment.id.desc())
+        .limit(COMMENT_PREVIEW_SIZE)
+        .subquery()
+        .select()
+        for post_id in post_ids
+    ]
+    previews: Dict[int, List[Dict[str, Any]]] = {post_id: [] for post_id in post_ids}
+    if not branches:
+        return previews
+    for row in db.execute(union_all(*branches)):
+        previews[row.post_id].append({
+            "id": row.id,
+            "content": row.content,
+            "author_id": row.author_id,
+            "created_at": row.created_at,
+            "author": {
+                "id": row.author_id,
+                "username": row.author_username,
+                "full_name": row.author_full_name,
+                "profile_picture": row.author_profile_picture,
+            },
+        })
+    return previews
+
+def build_post_summaries(
+    db: Session,
+    rows: Sequence[Any],
+    viewer_id: Optional[int]
+) -> List[Dict[str, Any]]:
+    """Turn ``post_summary_query`` rows into ``schemas.PostSummary`` payloads.
+
+    Adds per-viewer flags and the comment preview with one query each, so a
+    page costs the same regardless of how many likes or comments it has.
+    """
+    if COMMENT_PREVIEW_SIZE:
+        previews = _comment_previews(db, [row.id for row in rows])
+    else:
+        previews = {}
+    viewer_state = resolve_viewer_state(db, rows, viewer_id)
+
+    summaries = []
+    for row in rows:
+        summary = {
+            "id": row.id,
+            "content": row.content,
+            "image_url": row.image_url,
+            "author_id": row.author_id,
+            "created_at": row.created_at,
+            "updated_at": row.updated_at,
+            "likes_count": row.likes_count + like_buffer.delta(row.id),
+            "comments_count": row.comments_count,
+            "author": {
+                "id": row.author_id,
+                "username": row.author_username,
+                "full_name": row.author_full_name,
+                "profile_picture": row.author_profile_picture,
+            },
+            "latest_comments": previews.get(row.id, []),
+        }
+        for flag, post_ids in viewer_state.items():
+            summary[flag] = row.id in post_ids
+        summaries.append(summary)
+    return summaries
+
+def get_post_summary(db: Session, post_id: int, viewer_id: Optional[int]) -> Optional[Dict[str, Any]]:
+    """Summary payload for a single post, or None if it does not exist"""
+    rows = post_summary_query(db).filter(Post.id == post_id).all()
+    if not rows:
+        return None
+    return build_post_summaries(db, rows, viewer_id)[0]
+
+
+# Read paths shared by the sync and async endpoints. They take a sync Session;
+# async endpoints call them through AsyncSession.run_sync.
+
+def list_posts(
+    db: Session,
+    cursor: Optional[Cursor],
+    limit: int,
+    summary: bool,
+    viewer_id: Optional[int]
+) -> Dict[str, Any]:
+    """One newest-first page of all posts, as full posts or summaries"""
+    if summary:
+        rows, next_cursor = paginate(
+            post_summary_query(db), (Post.created_at, Post.id), cursor, limit
+        )
+        return {"items": build_post_summaries(db, rows, viewer_id), "next_cursor": next_cursor}
+
+    posts, next_cursor = paginate(
+        db.query(Post).options(*POST_OPTIONS), (Post.created_at, Post.id), cursor, limit
+    )
+    add_pending_likes(posts)
+    attach_viewer_state(db, posts, viewer_id)
+    return {"items": posts, "next_cursor": next_cursor}
+
+def feed_page(
+    db: Session,
+    user_id: int,
+    cursor: Optional[Cursor],
+    limit: int,
+    summary: bool
+) -> Dict[str, Any]:
+    """One page of a user's home feed, as full posts or summaries"""
+    post_ids, next_cursor = read_timeline(db, user_id, cursor, limit)
+    return {"items": posts_by_ids(db, post_ids, summary, user_id), "next_cursor": next_cursor}
+
+def posts_by_ids(
+    db: Session,
+    post_ids: Sequence[int],
+    summary: bool,
+    viewer_id: Optional[int]
+) -> List[Any]:
+    """Full posts or summaries for ``post_ids`` in that order, skipping missing ids"""
+    if summary:
+        rows = post_summary_query(db).filter(Post.id.in_(post_ids)).all()
+        return build_post_summaries(db, order_by_ids(rows, post_ids), viewer_id)
+
+    posts = db.query(Post)\
+        .options(*POST_OPTIONS)\
+        .filter(Post.id.in_(post_ids))\
+        .all()
+    posts = order_by_ids(posts, post_ids)
+    add_pending_likes(posts)
+    attach_viewer_state(db, posts, viewer_id)
+    return posts
+
+def get_posts_batch(
+    db: Session,
+    post_ids: Sequence[int],
+    summary: bool,
+    viewer_id: Optional[int]
+) -> Dict[str, Any]:
+    """Resolve many post ids at once; ids with no post are listed under ``missing``"""
+    post_ids = list(dict.fromkeys(post_ids))
+    items = posts_by_ids(db, post_ids, summary, viewer_id)
+    found = {item["id"] if summary else item.id for item in items}
+    return {"items": items, "missing": [id for id in post_ids if id not in found]}
+
+def get_post_for_viewer(db: Session, post_id: int, viewer_id: Optional[int]) -> Optional[Post]:
+    """A fully loaded post with the viewer's flags set, or None"""
+    post = get_post(db, post_id)
+    if post is not None:
+        add_pending_likes([post])
+        attach_viewer_state(db, [post], viewer_id)
+    return post
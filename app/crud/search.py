@@ -0,0 +1,45 @@
+from typing import Any, Dict, Optional
+from sqlalchemy import column, literal_column, select, table, tuple_
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.pagination import RankCursor, encode_rank_cursor
+from app.db import search
+from .post import posts_by_ids
+
+post_fts = table(search.POST_FTS, column("rowid"), column(search.POST_FTS))
+# BM25 is negative and lower for better matches, so ascending order ranks best first
+rank = literal_column(f"bm25({search.POST_FTS})")
+
+def search_posts(
+    db: Session,
+    query: str,
+    cursor: Optional[RankCursor],
+    limit: int,
+    summary: bool,
+    viewer_id: Optional[int]
+) -> Dict[str, Any]:
+    """One page of posts matching every word of ``query``, most relevant first.
+
+    Ranking and keyset pagination on ``(rank, id)`` run inside the FTS index;
+    only the ids of the page are then loaded as full posts or summaries.
+    """
+    expression = search.match_expression(
+        query, settings.SEARCH_MAX_TERMS, settings.SEARCH_MIN_PREFIX_LENGTH
+    )
+    if expression is None:
+        return {"items": [], "next_cursor": None}
+
+    statement = select(post_fts.c.rowid, rank)\
+        .where(post_fts.c[search.POST_FTS].match(expression))
+    if cursor is not None:
+        statement = statement.where(tuple_(rank, post_fts.c.rowid) > tuple_(*cursor))
+    hits = db.execute(
+        statement.order_by(rank, post_fts.c.rowid).limit(limit + 1)
+    ).all()
+
+    next_cursor = None
+    if len(hits) > limit:
+        hits = hits[:limit]
+        next_cursor = encode_rank_cursor(hits[-1][1], hits[-1][0])
+    items = posts_by_ids(db, [hit[0] for hit in hits], summary, viewer_id)
+    return {"items": items, "next_cursor": next_cursor}
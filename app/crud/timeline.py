@@ -0,0 +1,149 @@
+from typing import List, Optional, Tuple
+from sqlalchemy import func, literal, select, tuple_, union_all
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.pagination import Cursor, encode_cursor, paginate
+from app.models.post import Post
+from app.models.timeline import TimelineEntry
+from app.models.user import User, followers
+
+_COLUMNS = ["user_id", "post_id", "author_id", "created_at"]
+
+def fan_out_post(db: Session, post_id: int, author_id: int) -> None:
+    """Copy a new post into the timelines of its author and their followers.
+
+    Authors with more than ``FANOUT_MAX_FOLLOWERS`` followers are switched to
+    fan-out on read instead: only their own timeline gets the entry and
+    followers merge their posts in when reading the feed.
+    """
+    # Read the row rather than the identity map: the author is usually the
+    # request's cached principal, whose counters may lag behind
+    fanout_on_read, followers_count = db.query(User.fanout_on_read, User.followers_count)\
+        .filter(User.id == author_id)\
+        .one()
+    recipients = select(literal(author_id).label("user_id"))
+
+    if not fanout_on_read:
+        if followers_count > settings.FANOUT_MAX_FOLLOWERS:
+            db.query(User)\
+                .filter(User.id == author_id)\
+                .update(
+                    {User.fanout_on_read: True, User.updated_at: User.updated_at},
+                    synchronize_session=False
+                )
+        else:
+            recipients = union_all(
+                recipients,
+                select(followers.c.follower_id).where(followers.c.followed_id == author_id)
+            )
+
+    recipients = recipients.subquery()
+    db.execute(
+        TimelineEntry.__table__.insert().from_select(
+            _COLUMNS,
+            # An explicit join: one row per recipient, with no cartesian warning
+            select(recipients.c.user_id, Post.id, Post.author_id, Post.created_at)
+                .select_from(recipients)
+                .join(Post, Post.id == post_id)
+        )
+    )
+
+def backfill_timeline(db: Session, user_id: int, author_id: int) -> None:
+    """Add an author's recent posts to a user's timeline after a follow"""
+    author = db.get(User, author_id)
+    if author.fanout_on_read:
+        return
+    recent = select(literal(user_id), Post.id, Post.author_id, Post.created_at)\
+        .where(Post.author_id == author_id)\
+        .order_by(Post.created_at.desc(), Post.id.desc())\
+        .limit(settings.TIMELINE_MAX_LENGTH)
+    db.execute(TimelineEntry.__table__.insert().from_select(_COLUMNS, recent))
+
+def remove_author_from_timeline(db: Session, user_id: int, author_id: int) -> None:
+    """Drop an author's posts from a user's timeline after an unfollow"""
+    db.query(TimelineEntry)\
+        .filter(TimelineEntry.user_id == user_id, TimelineEntry.author_id == author_id)\
+        .delete(synchronize_session=False)
+
+def remove_post_from_timelines(db: Session, post_id: int) -> None:
+    db.query(TimelineEntry)\
+        .filter(TimelineEntry.post_id == post_id)\
+        .delete(synchronize_session=False)
+
+def read_timeline(
+    db: Session,
+    user_id: int,
+    cursor: Optional[Cursor],
+    limit: int
+) -> Tuple[List[int], Optional[str]]:
+    """Return one page of post ids for a user's home feed and the next cursor.
+
+    The materialized timeline is read with a single range scan on
+    ``(user_id, created_at, post_id)``; posts of followed fan-out-on-read
+    authors are paged the same way and merged in.
+    """
+    entries, more = paginate(
+        db.query(TimelineEntry.post_id, TimelineEntry.created_at)
+            .filter(TimelineEntry.user_id == user_id),
+        (TimelineEntry.created_at, TimelineEntry.post_id),
+        cursor,
+        limit
+    )
+    rows = [(entry.created_at, entry.post_id) for entry in entries]
+
+    pulled_authors = db.query(User.id)\
+        .join(followers, followers.c.followed_id == User.id)\
+        .filter(followers.c.follower_id == user_id, User.fanout_on_read.is_(True))\
+        .all()
+    if pulled_authors:
+        posts, more_pulled = paginate(
+            db.query(Post.id, Post.created_at)
+                .filter(Post.author_id.in_([author_id for author_id, in pulled_authors])),
+            (Post.created_at, Post.id),
+            cursor,
+            limit
+        )
+        # Posts written before the author switched to fan-out on read are in
+        # both sources
+        rows = sorted(set(rows) | {(post.created_at, post.id) for post in posts}, reverse=True)
+        more = more or more_pulled
+
+    page = rows[:limit]
+    next_cursor = None
+    if page and (more or len(rows) > limit):
+        next_cursor = encode_cursor(*page[-1])
+    return [post_id for _, post_id in page], next_cursor
+
+def trim_timelines(db: Session) -> int:
+    """Delete entries beyond ``TIMELINE_MAX_LENGTH`` from every timeline"""
+    ranked = select(
+        TimelineEntry.user_id,
+        TimelineEntry.post_id,
+        func.row_number().over(
+            partition_by=TimelineEntry.user_id,
+            order_by=(TimelineEntry.created_at.desc(), TimelineEntry.post_id.desc())
+        ).label("position")
+    ).subquery()
+    stale = select(ranked.c.user_id, ranked.c.post_id)\
+        .where(ranked.c.position > settings.TIMELINE_MAX_LENGTH)
+    return db.query(TimelineEntry)\
+        .filter(tuple_(TimelineEntry.user_id, TimelineEntry.post_id).in_(stale))\
+        .delete(synchronize_session=False)
+
+def rebuild_timelines(db: Session) -> None:
+    """Rebuild every timeline from posts and follows, e.g. for existing data"""
+    db.query(TimelineEntry).delete(synchronize_session=False)
+    recipients = union_all(
+        select(User.id.label("user_id"), User.id.label("author_id")),
+        select(followers.c.follower_id, followers.c.followed_id)
+            .join(User, User.id == followers.c.followed_id)
+            .where(User.fanout_on_read.is_(False))
+    ).subquery()
+    db.execute(
+        TimelineEntry.__table__.insert().from_select(
+            _COLUMNS,
+            select(recipients.c.user_id, Post.id, Post.author_id, Post.created_at)
+                .join(recipients, recipients.c.author_id == Post.author_id)
+        )
+    )
+    trim_timelines(db)
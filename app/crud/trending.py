@@ -0,0 +1,84 @@
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Sequence
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Session
+from app.core import trending
+from app.core.config import settings
+from app.core.pagination import RankCursor, encode_rank_cursor
+from app.db.dml import insert_ignore
+from app.models.trending import PostScore
+from .post import posts_by_ids
+
+PRUNE_TASK = "prune-trending"
+
+def _floor() -> float:
+    return trending.score_floor(
+        settings.TRENDING_MIN_SCORE,
+        datetime.now(timezone.utc),
+        settings.TRENDING_HALF_LIFE_SECONDS
+    )
+
+def record_engagement(db: Session, post_id: int, events: Sequence[trending.Event]) -> None:
+    """Fold likes, unlikes or comments of one post into its trending score.
+
+    A read-modify-write of the post's row in the caller's transaction, so the
+    score commits or rolls back with the engagement itself. A score that drops
+    below the pruning threshold removes the row.
+    """
+    half_life = settings.TRENDING_HALF_LIFE_SECONDS
+    floor = _floor()
+    query = db.query(PostScore.score)\
+        .filter(PostScore.post_id == post_id)\
+        .with_for_update()
+    row = query.first()
+    if row is None:
+        score = trending.combine(None, events, half_life)
+        if score is None or score < floor or insert_ignore(db, PostScore, post_id=post_id, score=score):
+            return
+        # Another transaction created the row first; add to it instead
+        row = query.first()
+
+    score = trending.combine(row.score, events, half_life)
+    scores = db.query(PostScore).filter(PostScore.post_id == post_id)
+    if score is None or score < floor:
+        scores.delete(synchronize_session=False)
+    else:
+        scores.update({PostScore.score: score}, synchronize_session=False)
+
+def remove_post_from_trending(db: Session, post_id: int) -> None:
+    """Drop a deleted post's score; the caller commits"""
+    db.query(PostScore)\
+        .filter(PostScore.post_id == post_id)\
+        .delete(synchronize_session=False)
+
+def prune_trending(db: Session) -> int:
+    """Delete scores that decayed below ``TRENDING_MIN_SCORE``; returns rows deleted"""
+    return db.query(PostScore)\
+        .filter(PostScore.score < _floor())\
+        .delete(synchronize_session=False)
+
+def trending_page(
+    db: Session,
+    cursor: Optional[RankCursor],
+    limit: int,
+    summary: bool,
+    viewer_id: Optional[int]
+) -> Dict[str, Any]:
+    """One page of posts by current trending score, highest first.
+
+    Reads ``limit`` entries of the score index from the top and loads only
+    those posts, so the cost does not depend on how many posts are scored.
+    """
+    query = db.query(PostScore.post_id, PostScore.score)
+    if cursor is not None:
+        query = query.filter(tuple_(PostScore.score, PostScore.post_id) < tuple_(*cursor))
+    rows = query.order_by(PostScore.score.desc(), PostScore.post_id.desc())\
+        .limit(limit + 1)\
+        .all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_rank_cursor(rows[-1].score, rows[-1].post_id)
+    items = posts_by_ids(db, [row.post_id for row in rows], summary, viewer_id)
+    return {"items": items, "next_cursor": next_cursor}
@@ -0,0 +1,51 @@
+from datetime import datetime
+from typing import Optional, Tuple
+from sqlalchemy import exists, false, func, select
+from sqlalchemy.orm import Session
+from app.core.like_buffer import like_buffer
+from app.models.post import Comment, Like, Post
+from app.models.user import User
+
+# What cached representations depend on, read without loading the objects.
+# Embedded users (authors, commenters, likers) can only change when the latest
+# profile edit of any user moves, which ix_user_updated_at makes one lookup.
+
+def _profile_epoch():
+    return select(func.max(User.updated_at)).scalar_subquery()
+
+def post_cache_state(
+    db: Session,
+    post_id: int,
+    viewer_id: Optional[int]
+) -> Optional[Tuple[int, Optional[datetime], bool, int]]:
+    """``(version, profile epoch, viewer has liked, unwritten likes)`` for a post, or None if missing"""
+    if viewer_id is not None:
+        liked = exists().where(Like.post_id == Post.id, Like.user_id == viewer_id)
+    else:
+        liked = false()
+    row = db.query(Post.version, _profile_epoch(), liked)\
+        .filter(Post.id == post_id)\
+        .first()
+    if row is None:
+        return None
+    version, profile_epoch, has_liked = row
+    if viewer_id is not None:
+        has_liked = post_id in like_buffer.overlay(viewer_id, [post_id], {post_id} if has_liked else set())
+    return version, profile_epoch, bool(has_liked), like_buffer.delta(post_id)
+
+def comments_cache_state(
+    db: Session,
+    post_id: int
+) -> Optional[Tuple[int, Optional[datetime], Optional[datetime]]]:
+    """``(comments count, latest comment time, profile epoch)`` for a post, or None if missing.
+
+    Comments are append-only, so the count and the latest time move together
+    and the latest of the two timestamps is a valid Last-Modified.
+    """
+    latest_comment = select(func.max(Comment.created_at))\
+        .where(Comment.post_id == Post.id)\
+        .scalar_subquery()
+    row = db.query(Post.comments_count, latest_comment, _profile_epoch())\
+        .filter(Post.id == post_id)\
+        .first()
+    return tuple(row) if row is not None else None
@@ -0,0 +1,45 @@
+from typing import Any, Callable, Dict, Optional, Sequence, Set
+from sqlalchemy.orm import Session
+from app.core.like_buffer import like_buffer
+from app.models.post import Like
+
+# A resolver receives the viewer id and a page of posts and returns the ids
+# of the posts for which its flag is true, using a single query.
+ViewerFlagResolver = Callable[[Session, int, Sequence[Any]], Set[int]]
+
+def _liked_post_ids(db: Session, viewer_id: int, posts: Sequence[Any]) -> Set[int]:
+    post_ids = [post.id for post in posts]
+    rows = db.query(Like.post_id)\
+        .filter(Like.user_id == viewer_id, Like.post_id.in_(post_ids))\
+        .all()
+    # The viewer sees their own likes that are still in the write-behind buffer
+    return like_buffer.overlay(viewer_id, post_ids, {post_id for post_id, in rows})
+
+# Per-viewer flags exposed on post responses, keyed by response attribute
+VIEWER_FLAGS: Dict[str, ViewerFlagResolver] = {
+    "user_has_liked": _liked_post_ids,
+}
+
+def resolve_viewer_state(
+    db: Session,
+    posts: Sequence[Any],
+    viewer_id: Optional[int]
+) -> Dict[str, Set[int]]:
+    """Return, for every registered flag, the ids of ``posts`` it applies to"""
+    if viewer_id is None or not posts:
+        return {flag: set() for flag in VIEWER_FLAGS}
+    return {
+        flag: resolve(db, viewer_id, posts)
+        for flag, resolve in VIEWER_FLAGS.items()
+    }
+
+def attach_viewer_state(
+    db: Session,
+    posts: Sequence[Any],
+    viewer_id: Optional[int]
+) -> None:
+    """Set every per-viewer flag on ``posts`` with one query per flag per page"""
+    state = resolve_viewer_state(db, posts, viewer_id)
+    for post in posts:
+        for flag, post_ids in state.items():
+            setattr(post, flag, post.id in post_ids)
@@ -1,3 +1,6 @@
 # For alembic autogeneration
 from app.models.user import User  
-from app.models.post import Post, Comment, Like  
\ No newline at end of file
+from app.models.post import Post, Comment, Like  
+from app.models.timeline import TimelineEntry
+from app.models.trending import PostScore
+from app.db import search  # noqa: F401  FTS index DDL runs with create_all
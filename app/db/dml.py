@@ -0,0 +1,29 @@
+from typing import Any, Dict, List, Sequence
+from sqlalchemy import Select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+# Dialects whose INSERT supports ON CONFLICT DO NOTHING
+_INSERTS = {
+    "sqlite": sqlite.insert,
+    "postgresql": postgresql.insert,
+}
+
+def _insert(db: Session, table: Any) -> Any:
+    return _INSERTS[db.get_bind().dialect.name](table)
+
+def insert_ignore(db: Session, table: Any, **values: Any) -> int:
+    """Insert one row unless it conflicts with a unique key; return rows inserted (0 or 1)"""
+    return db.execute(_insert(db, table).values(**values).on_conflict_do_nothing()).rowcount
+
+def insert_ignore_from_select(db: Session, table: Any, names: Sequence[str], select: Select) -> int:
+    """INSERT ... SELECT skipping rows that conflict with a unique key; return rows inserted"""
+    return db.execute(
+        _insert(db, table).from_select(names, select).on_conflict_do_nothing()
+    ).rowcount
+
+def insert_ignore_many(db: Session, table: Any, rows: List[Dict[str, Any]], returning: Any) -> List[Any]:
+    """Multi-row INSERT skipping rows that conflict with a unique key; return ``returning`` of inserted rows"""
+    return db.execute(
+        _insert(db, table).values(rows).on_conflict_do_nothing().returning(returning)
+    ).scalars().all()
@@ -0,0 +1,81 @@
+import logging
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator, List, Optional, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.core import metrics
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+statement_time = metrics.histogram(
+    "db_statement_seconds", "Time SQL statements take to execute"
+)
+slow_statements = metrics.counter(
+    "db_slow_statements_total", "SQL statements slower than SLOW_QUERY_SECONDS"
+)
+
+class RequestStats:
+    """SQL executed on behalf of one request"""
+
+    def __init__(self) -> None:
+        self.statements = 0
+        self.db_time = 0.0
+        self.by_statement: Counter = Counter()
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """Statements executed more than ``threshold`` times, most repeated first"""
+        return [(statement, count) for statement, count in self.by_statement.most_common() if count > threshold]
+
+    def add(self, other: "RequestStats") -> None:
+        self.statements += other.statements
+        self.db_time += other.db_time
+        self.by_statement.update(other.by_statement)
+
+# Set for the duration of a request; copied into threadpool workers and
+# greenlets, so sync endpoints and AsyncSession.run_sync report here too
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+@contextmanager
+def track_request() -> Iterator[RequestStats]:
+    """Attribute statements executed inside the block to a new ``RequestStats``.
+
+    Blocks may nest: an enclosing block's stats include those of the blocks
+    inside it, e.g. a client timing requests around the app's own tracking.
+    """
+    stats = RequestStats()
+    outer = _request_stats.get()
+    token = _request_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _request_stats.reset(token)
+        if outer is not None:
+            outer.add(stats)
+
+def _before_execute(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool) -> None:
+    # Cursor executions on one connection never nest, and a failed statement
+    # just leaves a start time for the next one to overwrite
+    conn.info["statement_started"] = time.perf_counter()
+
+def _after_execute(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool) -> None:
+    elapsed = time.perf_counter() - conn.info["statement_started"]
+    statement_time.observe(elapsed)
+    if elapsed >= settings.SLOW_QUERY_SECONDS:
+        slow_statements.inc()
+        logger.warning("Slow SQL statement (%.3fs): %s %r", elapsed, statement, parameters)
+
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.statements += 1
+        stats.db_time += elapsed
+        stats.by_statement[statement] += 1
+
+def instrument(engine: Engine) -> None:
+    """Time every statement on ``engine``, log slow ones and feed ``RequestStats``"""
+    if not event.contains(engine, "before_cursor_execute", _before_execute):
+        event.listen(engine, "before_cursor_execute", _before_execute)
+        event.listen(engine, "after_cursor_execute", _after_execute)
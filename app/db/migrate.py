@@ -0,0 +1,25 @@
+"""One-shot schema setup, run once per deploy before any server starts.
+
+Usage: python -m app.db.migrate [revision]
+"""
+import logging
+import os
+import sys
+from alembic import command
+from alembic.config import Config
+from app.core.config import settings
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def migrate(revision: str = "head") -> None:
+    """Upgrade the database to ``revision`` and create the media directory"""
+    config = Config(os.path.join(ROOT, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(ROOT, "alembic"))
+    # Keep the caller's logging; alembic/env.py would replace it from the ini
+    config.attributes["configure_logger"] = False
+    command.upgrade(config, revision)
+    os.makedirs(settings.MEDIA_PATH, exist_ok=True)
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(levelname)-5.5s [%(name)s] %(message)s")
+    migrate(sys.argv[1] if len(sys.argv) > 1 else "head")
@@ -0,0 +1,45 @@
+from contextlib import contextmanager
+from typing import Any, Iterator, List, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.db.session import async_engine, engine as default_engine
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+class QueryCounter:
+    """Collects every SQL statement executed on an engine while attached"""
+
+    def __init__(self) -> None:
+        self.statements: List[str] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def __call__(self, conn: Any, cursor: Any, statement: str, *args: Any) -> None:
+        self.statements.append(statement)
+
+@contextmanager
+def count_queries(engine: Optional[Engine] = None) -> Iterator[QueryCounter]:
+    """Count the statements executed on ``engine`` (default: both app engines) inside the block"""
+    engines = [engine] if engine else [default_engine, async_engine.sync_engine]
+    counter = QueryCounter()
+    for target in engines:
+        event.listen(target, "before_cursor_execute", counter)
+    try:
+        yield counter
+    finally:
+        for target in engines:
+            event.remove(target, "before_cursor_execute", counter)
+
+@contextmanager
+def query_budget(budget: int, engine: Optional[Engine] = None) -> Iterator[QueryCounter]:
+    """Fail with ``QueryBudgetExceeded`` if the block runs more than ``budget`` statements"""
+    with count_queries(engine) as counter:
+        yield counter
+    if counter.count > budget:
+        raise QueryBudgetExceeded(
+            f"{counter.count} SQL statements executed, budget is {budget}:\n"
+            + "\n".join(counter.statements)
+        )
@@ -0,0 +1,94 @@
+"""SQLite FTS5 index over post content.
+
+``post_fts`` is an external-content table: it stores only the inverted index
+and reads content from ``post`` by rowid. Triggers keep it in step with every
+INSERT, DELETE and content UPDATE, so the ORM, bulk statements and raw SQL all
+stay indexed. Counter updates do not touch ``content`` and skip the index.
+
+Usage: python -m app.db.search  (install if missing, then rebuild from ``post``)
+"""
+import re
+from typing import Any, List, Optional
+from sqlalchemy import DDL, event, text
+from sqlalchemy.engine import Connection
+from app.models.post import Post
+
+POST_FTS = "post_fts"
+
+# unicode61 folds case and diacritics; the prefix index serves 2 and 3
+# character "ab*" queries without walking the whole term list
+CREATE_STATEMENTS = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS post_fts USING fts5("
+    "content, content='post', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+    "CREATE TRIGGER IF NOT EXISTS post_fts_insert AFTER INSERT ON post BEGIN "
+    "INSERT INTO post_fts (rowid, content) VALUES (new.id, new.content); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS post_fts_delete AFTER DELETE ON post BEGIN "
+    "INSERT INTO post_fts (post_fts, rowid, content) VALUES ('delete', old.id, old.content); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS post_fts_update AFTER UPDATE OF content ON post BEGIN "
+    "INSERT INTO post_fts (post_fts, rowid, content) VALUES ('delete', old.id, old.content); "
+    "INSERT INTO post_fts (rowid, content) VALUES (new.id, new.content); "
+    "END",
+]
+
+DROP_TRIGGER_STATEMENTS = [
+    "DROP TRIGGER IF EXISTS post_fts_update",
+    "DROP TRIGGER IF EXISTS post_fts_delete",
+    "DROP TRIGGER IF EXISTS post_fts_insert",
+]
+DROP_STATEMENTS = DROP_TRIGGER_STATEMENTS + ["DROP TABLE IF EXISTS post_fts"]
+
+for statement in CREATE_STATEMENTS:
+    event.listen(Post.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+for statement in DROP_STATEMENTS:
+    event.listen(Post.__table__, "before_drop", DDL(statement).execute_if(dialect="sqlite"))
+
+def supported(bind: Any) -> bool:
+    """Whether ``bind`` is a database with the FTS index"""
+    return bind.dialect.name == "sqlite"
+
+def install(connection: Connection) -> None:
+    """Create the index and its triggers if they do not exist yet"""
+    for statement in CREATE_STATEMENTS:
+        connection.exec_driver_sql(statement)
+
+def drop_triggers(connection: Connection) -> None:
+    """Stop indexing writes, e.g. for a bulk load; then ``install`` and ``rebuild``"""
+    for statement in DROP_TRIGGER_STATEMENTS:
+        connection.exec_driver_sql(statement)
+
+def rebuild(connection: Connection) -> None:
+    """Reindex every post from scratch and merge the index into one segment"""
+    connection.execute(text("INSERT INTO post_fts (post_fts) VALUES ('rebuild')"))
+    connection.execute(text("INSERT INTO post_fts (post_fts) VALUES ('optimize')"))
+
+_WORD = re.compile(r"\w+\*?")
+
+def match_expression(query: str, max_terms: int, min_prefix_length: int) -> Optional[str]:
+    """Turn free text into a safe FTS5 expression matching every word.
+
+    Each word is quoted so FTS5 operators and column filters in user input are
+    taken literally; a trailing ``*`` makes a word a prefix. Returns None when
+    the query has no searchable words.
+    """
+    terms: List[str] = []
+    for word in _WORD.findall(query)[:max_terms]:
+        stem = word.rstrip("*")
+        if word.endswith("*") and len(stem) >= min_prefix_length:
+            terms.append(f'"{stem}"*')
+        else:
+            terms.append(f'"{stem}"')
+    return " ".join(terms) or None
+
+if __name__ == "__main__":
+    from app.db.session import engine
+
+    if not supported(engine):
+        raise SystemExit(f"Full-text search needs SQLite, not {engine.dialect.name}")
+    with engine.begin() as connection:
+        install(connection)
+        rebuild(connection)
+        count = connection.execute(text("SELECT count(*) FROM post")).scalar()
+    print(f"Indexed {count} posts")
@@ -0,0 +1,13 @@
+from sqlalchemy import DateTime
+from sqlalchemy.dialects.sqlite import DATETIME
+
+# SQLite stores server-side timestamps as "YYYY-MM-DD HH:MM:SS" text while
+# SQLAlchemy binds datetimes with a microsecond suffix. Keep both in the same
+# format so keyset comparisons on timestamp columns order correctly.
+Timestamp = DateTime(timezone=True).with_variant(
+    DATETIME(
+        storage_format="%(year)04d-%(month)02d-%(day)02d "
+        "%(hour)02d:%(minute)02d:%(second)02d"
+    ),
+    "sqlite",
+)
@@ -1,20 +1,108 @@
-from fastapi import FastAPI
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from app.api.v1.endpoints import auth, users, posts
+from fastapi.responses import JSONResponse, PlainTextResponse
+from app import crud
+from app.api.v1.endpoints import auth, users, posts, media
+from app.core import images, metrics, security, tasks
 from app.core.config import settings
-from app.db.base import Base
-from app.db.session import engine
-import os
+from app.core.executors import PoolUnavailable
+from app.core.middleware import MetricsMiddleware
+from app.db import instrumentation
+from app.db.session import SessionLocal, async_engine, engine
 
-# Create all tables in the database
-Base.metadata.create_all(bind=engine)
+# The schema and media directory are set up by `python -m app.db.migrate`,
+# not here: importing the app must stay free of I/O so a server can preload
+# it once and fork workers from it.
 
-# Create media directory if it doesn't exist
-os.makedirs(settings.MEDIA_PATH, exist_ok=True)
+# Time every SQL statement and attribute it to the request that ran it
+instrumentation.instrument(engine)
+instrumentation.instrument(async_engine.sync_engine)
+
+startup_time = metrics.gauge(
+    "app_startup_seconds", "Time this worker's lifespan startup took"
+)
+
+def start_background_tasks():
+    tasks.start_periodic(
+        "trim-timelines",
+        settings.TIMELINE_TRIM_INTERVAL_SECONDS,
+        crud.trim_timelines,
+        exclusive=True
+    )
+    tasks.start_periodic(
+        "collect-media",
+        settings.MEDIA_GC_INTERVAL_SECONDS,
+        crud.collect_media,
+        exclusive=True
+    )
+    tasks.start_periodic(
+        crud.PRUNE_TASK,
+        settings.TRENDING_PRUNE_INTERVAL_SECONDS,
+        crud.prune_trending,
+        exclusive=True
+    )
+    # The like buffer and the metrics are this process's own
+    if settings.LIKE_WRITE_BEHIND:
+        tasks.start_periodic(
+            crud.FLUSH_TASK,
+            settings.LIKE_FLUSH_INTERVAL_SECONDS,
+            crud.flush_likes
+        )
+    if settings.METRICS_MULTIPROC_DIR:
+        tasks.start_periodic(
+            "write-metrics",
+            settings.METRICS_WRITE_INTERVAL_SECONDS,
+            lambda db: metrics.write_snapshot(settings.METRICS_MULTIPROC_DIR)
+        )
+
+def stop_background_tasks():
+    tasks.stop_periodic()
+    if settings.LIKE_WRITE_BEHIND:
+        # Write whatever the flusher had not picked up yet
+        db = SessionLocal()
+        try:
+            crud.flush_likes(db)
+        finally:
+            db.close()
+    if settings.METRICS_MULTIPROC_DIR:
+        metrics.write_snapshot(settings.METRICS_MULTIPROC_DIR)
+    security.hash_pool.shutdown()
+    images.image_pool.shutdown()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Per-worker startup and shutdown; runs in each worker after the fork"""
+    started = time.perf_counter()
+    # Connections must never be shared across processes; drop any the
+    # master opened before forking without closing them under its feet
+    engine.dispose(close=False)
+    await async_engine.dispose(close=False)
+    # Open each pool's first connection now, so a bad DATABASE_URL fails the
+    # worker's boot instead of its first request
+    with engine.connect() as conn:
+        conn.exec_driver_sql("SELECT 1")
+    async with async_engine.connect() as conn:
+        await conn.exec_driver_sql("SELECT 1")
+    security.hash_pool.start()
+    images.image_pool.start()
+    start_background_tasks()
+    startup_time.set(time.perf_counter() - started)
+    if settings.METRICS_MULTIPROC_DIR:
+        metrics.write_snapshot(settings.METRICS_MULTIPROC_DIR)
+    try:
+        yield
+    finally:
+        stop_background_tasks()
+        engine.dispose()
+        await async_engine.dispose()
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Set up CORS middleware
@@ -26,6 +114,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Added last so it is outermost and times everything above, CORS included
+app.add_middleware(MetricsMiddleware)
+
 # Include routers
 app.include_router(
     auth.router,
@@ -45,7 +136,31 @@ app.include_router(
     tags=["posts"]
 )
 
+app.include_router(
+    media.router,
+    prefix="/media",
+    tags=["media"]
+)
+
+@app.exception_handler(PoolUnavailable)
+def pool_unavailable_handler(request: Request, exc: PoolUnavailable):
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Server busy, please retry"},
+        headers={"Retry-After": "1"}
+    )
+
 # Health check endpoint
 @app.get("/health")
 def health_check():
-    return {"status": "healthy"}
\ No newline at end of file
+    return {"status": "healthy"}
+
+# Prometheus scrape endpoint
+@app.get("/metrics", include_in_schema=False)
+def metrics_endpoint():
+    if settings.METRICS_MULTIPROC_DIR:
+        # The scrape reaches one worker; report all of them
+        body = metrics.render_directory(settings.METRICS_MULTIPROC_DIR)
+    else:
+        body = metrics.render()
+    return PlainTextResponse(body, media_type=metrics.CONTENT_TYPE)
\ No newline at end of file
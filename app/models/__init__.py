@@ -1,3 +1,5 @@
 # Make models directory a Python package
 from .user import User
-from .post import Post, Comment, Like
\ No newline at end of file
+from .post import Post, Comment, Like
+from .timeline import TimelineEntry
+from .trending import PostScore
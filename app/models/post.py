@@ -1,38 +1,61 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, UniqueConstraint
+from sqlalchemy import Column, Index, Integer, String, ForeignKey, Text, UniqueConstraint
 from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, literal_column
 from app.db.base import Base
+from app.db.types import Timestamp
 
 class Post(Base):
     id = Column(Integer, primary_key=True, index=True)
     content = Column(Text, nullable=False)
-    image_url = Column(String)  
+    image_url = Column(String, index=True)
     author_id = Column(Integer, ForeignKey("user.id"), nullable=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    created_at = Column(Timestamp, server_default=func.now())
+    updated_at = Column(Timestamp, onupdate=func.now())
+
+    # Denormalized counters, maintained alongside Like/Comment writes
+    likes_count = Column(Integer, nullable=False, default=0, server_default="0")
+    comments_count = Column(Integer, nullable=False, default=0, server_default="0")
+    # Bumped by every UPDATE of the row, counters included; feeds the post's ETag
+    version = Column(
+        Integer,
+        nullable=False,
+        default=1,
+        server_default="1",
+        onupdate=literal_column("version") + 1
+    )
 
     # Relationships
     author = relationship("User", back_populates="posts")
     comments = relationship("Comment", back_populates="post", cascade="all, delete-orphan")
     likes = relationship("Like", back_populates="post", cascade="all, delete-orphan")
 
+    # Keyset pagination walks (created_at, id); per-author for pulled feed authors
+    __table_args__ = (
+        Index("ix_post_author_created", "author_id", "created_at", "id"),
+        Index("ix_post_created", "created_at", "id"),
+    )
+
 class Comment(Base):
     id = Column(Integer, primary_key=True, index=True)
     content = Column(Text, nullable=False)
     post_id = Column(Integer, ForeignKey("post.id"), nullable=False)
     author_id = Column(Integer, ForeignKey("user.id"), nullable=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    created_at = Column(Timestamp, server_default=func.now())
+    updated_at = Column(Timestamp, onupdate=func.now())
 
     # Relationships
     post = relationship("Post", back_populates="comments")
     author = relationship("User", back_populates="comments")
 
+    __table_args__ = (
+        Index("ix_comment_post_created", "post_id", "created_at", "id"),
+    )
+
 class Like(Base):
     id = Column(Integer, primary_key=True, index=True)
     post_id = Column(Integer, ForeignKey("post.id"), nullable=False)
     user_id = Column(Integer, ForeignKey("user.id"), nullable=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(Timestamp, server_default=func.now())
 
     # Relationships
     post = relationship("Post", back_populates="likes")
@@ -40,4 +63,6 @@ class Like(Base):
 
     __table_args__ = (
         UniqueConstraint('post_id', 'user_id', name='unique_user_post_like'),
+        # The unique constraint serves lookups by post; this one serves a viewer's likes
+        Index("ix_like_user_post", "user_id", "post_id"),
     )
\ No newline at end of file
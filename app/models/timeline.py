@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Integer, ForeignKey, Index
+from app.db.base import Base
+from app.db.types import Timestamp
+
+class TimelineEntry(Base):
+    """A post materialized into one user's home timeline at write time"""
+    __tablename__ = "timeline_entry"
+
+    user_id = Column(Integer, ForeignKey("user.id"), primary_key=True)
+    post_id = Column(Integer, ForeignKey("post.id"), primary_key=True, index=True)
+    author_id = Column(Integer, ForeignKey("user.id"), nullable=False)
+    created_at = Column(Timestamp, nullable=False)
+
+    __table_args__ = (
+        Index("ix_timeline_entry_user_created", "user_id", "created_at", "post_id"),
+    )
@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Float, ForeignKey, Index, Integer
+from app.db.base import Base
+
+class PostScore(Base):
+    """A post's time-decayed engagement score, kept in log space.
+
+    ``score`` is ``ln(sum(weight * 2 ** (age_at_epoch / half_life)))``: the
+    decay of every post relative to a fixed epoch, so the ordering never needs
+    rescoring as time passes and the top-k is an index range scan.
+    """
+    __tablename__ = "post_score"
+
+    post_id = Column(Integer, ForeignKey("post.id"), primary_key=True)
+    score = Column(Float, nullable=False)
+
+    __table_args__ = (
+        Index("ix_post_score_score", "score", "post_id"),
+    )
@@ -1,14 +1,17 @@
-from sqlalchemy import Boolean, Column, Integer, String, DateTime, Table, ForeignKey
+from sqlalchemy import Boolean, Column, Index, Integer, String, Table, ForeignKey
 from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, false
 from app.db.base import Base
+from app.db.types import Timestamp
 
 # Association table for followers
 followers = Table(
     'followers',
     Base.metadata,
     Column('follower_id', Integer, ForeignKey('user.id'), primary_key=True),
-    Column('followed_id', Integer, ForeignKey('user.id'), primary_key=True)
+    Column('followed_id', Integer, ForeignKey('user.id'), primary_key=True),
+    # The primary key serves "who do I follow"; this serves "who follows me"
+    Index('ix_followers_followed_follower', 'followed_id', 'follower_id')
 )
 
 class User(Base):
@@ -18,10 +21,17 @@ class User(Base):
     hashed_password = Column(String, nullable=False)
     full_name = Column(String)
     bio = Column(String)
-    profile_picture = Column(String)
+    profile_picture = Column(String, index=True)
     is_active = Column(Boolean, default=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # Set once the user outgrows fan-out on write; followers then merge
+    # this user's posts into their feed at read time
+    fanout_on_read = Column(Boolean, nullable=False, default=False, server_default=false())
+    # Denormalized from ``followers``, maintained by crud.follow / crud.unfollow
+    followers_count = Column(Integer, nullable=False, default=0, server_default="0")
+    following_count = Column(Integer, nullable=False, default=0, server_default="0")
+    created_at = Column(Timestamp, server_default=func.now())
+    # Indexed so the latest profile edit, which invalidates embedded users, is cheap to find
+    updated_at = Column(Timestamp, onupdate=func.now(), index=True)
 
     # Relationships
     posts = relationship("Post", back_populates="author", cascade="all, delete-orphan")
@@ -1,3 +1,3 @@
 # Make schemas directory a Python package
-from .user import User, UserCreate, UserUpdate, UserInDB, Token, TokenPayload, UserWithFollowInfo
-from .post import Post, PostCreate, PostUpdate, Comment, CommentCreate, Like, PostWithInteractions
\ No newline at end of file
+from .user import User, UserCreate, UserUpdate, UserInDB, Token, TokenPayload, UserWithFollowInfo, UserSummary, UserBatch
+from .post import Post, PostCreate, PostUpdate, Comment, CommentCreate, Like, LikeStatus, PostWithInteractions, PostPage, CommentPage, CommentPreview, PostView, PostSummary, PostSummaryPage, PostBatch, PostSummaryBatch
\ No newline at end of file
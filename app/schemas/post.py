@@ -1,7 +1,8 @@
 from typing import Optional, List
 from pydantic import BaseModel
 from datetime import datetime
-from .user import User
+from enum import Enum
+from .user import User, UserSummary
 
 class CommentBase(BaseModel):
     content: str
@@ -32,16 +33,21 @@ class Like(LikeBase):
     class Config:
         from_attributes = True
 
+class LikeStatus(BaseModel):
+    liked: bool
+    likes_count: int
+
 class PostBase(BaseModel):
     content: str
     image_url: Optional[str] = None
 
-class PostCreate(PostBase):
-    pass
+# image_url is set only by uploading an image: it names a file in the media
+# store, which the client must not be able to point anywhere else
+class PostCreate(BaseModel):
+    content: str
 
 class PostUpdate(BaseModel):
     content: Optional[str] = None
-    image_url: Optional[str] = None
 
 class Post(PostBase):
     id: int
@@ -58,4 +64,45 @@ class Post(PostBase):
         from_attributes = True
 
 class PostWithInteractions(Post):
-    user_has_liked: bool = False
\ No newline at end of file
+    user_has_liked: bool = False
+
+class PostPage(BaseModel):
+    items: List[PostWithInteractions]
+    next_cursor: Optional[str] = None
+
+class CommentPage(BaseModel):
+    items: List[Comment]
+    next_cursor: Optional[str] = None
+
+class PostView(str, Enum):
+    full = "full"
+    summary = "summary"
+
+class CommentPreview(CommentBase):
+    id: int
+    author_id: int
+    created_at: datetime
+    author: UserSummary
+
+class PostSummary(PostBase):
+    id: int
+    author_id: int
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+    author: UserSummary
+    likes_count: int = 0
+    comments_count: int = 0
+    user_has_liked: bool = False
+    latest_comments: List[CommentPreview] = []
+
+class PostSummaryPage(BaseModel):
+    items: List[PostSummary]
+    next_cursor: Optional[str] = None
+
+class PostBatch(BaseModel):
+    items: List[PostWithInteractions]
+    missing: List[int] = []
+
+class PostSummaryBatch(BaseModel):
+    items: List[PostSummary]
+    missing: List[int] = []
@@ -1,7 +1,24 @@
-from typing import Optional
-from pydantic import BaseModel, EmailStr, Field
+from typing import List, Optional
+from typing_extensions import Annotated
+from pydantic import AfterValidator, BaseModel, EmailStr, Field, WithJsonSchema
 from datetime import datetime
 
+# An address read back from the database was validated when it was stored;
+# checking it again on every response dominates serialization time. It is
+# documented exactly like EmailStr.
+StoredEmail = Annotated[str, WithJsonSchema({"type": "string", "format": "email"})]
+
+# Paths under /users/ that are routes rather than profiles
+RESERVED_USERNAMES = {"batch", "me"}
+
+def _not_reserved(username: str) -> str:
+    if username in RESERVED_USERNAMES:
+        raise ValueError(f"{username!r} is reserved")
+    return username
+
+# A username a user may choose; stored ones are not checked again
+NewUsername = Annotated[str, AfterValidator(_not_reserved)]
+
 class UserBase(BaseModel):
     email: EmailStr
     username: str
@@ -9,16 +26,18 @@ class UserBase(BaseModel):
     bio: Optional[str] = None
 
 class UserCreate(UserBase):
+    username: NewUsername
     password: str = Field(..., min_length=8)
 
 class UserUpdate(BaseModel):
     email: Optional[EmailStr] = None
-    username: Optional[str] = None
+    username: Optional[NewUsername] = None
     full_name: Optional[str] = None
     bio: Optional[str] = None
-    profile_picture: Optional[str] = None
+    # No profile_picture: it is set by uploading one, see PostCreate
 
 class UserInDBBase(UserBase):
+    email: StoredEmail
     id: int
     is_active: bool
     profile_picture: Optional[str] = None
@@ -31,6 +50,12 @@ class UserInDBBase(UserBase):
 class User(UserInDBBase):
     pass
 
+class UserSummary(BaseModel):
+    id: int
+    username: str
+    full_name: Optional[str] = None
+    profile_picture: Optional[str] = None
+
 class UserInDB(UserInDBBase):
     hashed_password: str
 
@@ -44,4 +69,8 @@ class TokenPayload(BaseModel):
 
 class UserWithFollowInfo(User):
     followers_count: int
-    following_count: int
\ No newline at end of file
+    following_count: int
+
+class UserBatch(BaseModel):
+    items: List[UserWithFollowInfo]
+    missing: List[str] = []
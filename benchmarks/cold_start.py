@@ -0,0 +1,192 @@
+"""Cold start, graceful restart and shutdown of a real server process.
+
+Against a migrated scratch database this measures:
+
+- importing ``app.main`` in a fresh interpreter, which every non-preloaded
+  worker pays;
+- time from launching the server until /health first answers and until every
+  worker has finished its lifespan startup;
+- latency of the first requests a worker serves against its warm median;
+- with gunicorn, a graceful restart (SIGHUP) while /health is polled, which
+  must not fail a single request;
+- time for SIGTERM to drain and stop every worker.
+
+Usage: python -m benchmarks.cold_start [--server gunicorn|uvicorn] [--workers 2]
+"""
+import argparse
+import os
+import re
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from benchmarks.env import use_scratch_database
+
+use_scratch_database("cold_start")
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+READY = re.compile(r"Application startup complete")
+
+def import_time(rounds: int) -> float:
+    """Median seconds to import ``app.main`` in a fresh interpreter"""
+    code = "import time; t = time.perf_counter(); import app.main; print(time.perf_counter() - t)"
+    times = [
+        float(subprocess.run(
+            [sys.executable, "-c", code], cwd=ROOT, check=True, capture_output=True, text=True
+        ).stdout)
+        for _ in range(rounds)
+    ]
+    return statistics.median(times)
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+class Server:
+    """A server subprocess whose log lines are timestamped as they arrive"""
+
+    def __init__(self, command: List[str]) -> None:
+        self.started = time.perf_counter()
+        self.lines: List[tuple] = []
+        self.process = subprocess.Popen(
+            command, cwd=ROOT, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True
+        )
+        threading.Thread(target=self._read, daemon=True).start()
+
+    def _read(self) -> None:
+        for line in self.process.stdout:
+            self.lines.append((time.perf_counter(), line.rstrip()))
+
+    def wait_for(self, pattern: "re.Pattern[str]", count: int, since: float, timeout: float = 60) -> float:
+        """Seconds from ``since`` until ``count`` log lines after it match ``pattern``"""
+        deadline = time.perf_counter() + timeout
+        while time.perf_counter() < deadline:
+            matches = [at for at, line in list(self.lines) if at >= since and pattern.search(line)]
+            if len(matches) >= count:
+                return matches[count - 1] - since
+            if self.process.poll() is not None:
+                break
+            time.sleep(0.01)
+        print("\n".join(line for _, line in self.lines[-20:]), file=sys.stderr)
+        raise RuntimeError(f"server did not log {count} x {pattern.pattern!r}")
+
+def first_answer(client: httpx.Client, since: float, timeout: float = 60) -> float:
+    """Seconds from ``since`` until /health answers 200"""
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            if client.get("/health").status_code == 200:
+                return time.perf_counter() - since
+        except httpx.TransportError:
+            pass
+        time.sleep(0.005)
+    raise RuntimeError("server never answered /health")
+
+def timed(client: httpx.Client, method: str, path: str, **kwargs: Any) -> Tuple[float, httpx.Response]:
+    started = time.perf_counter()
+    response = client.request(method, path, **kwargs)
+    elapsed = time.perf_counter() - started
+    assert response.status_code == 200, f"{method} {path}: {response.text}"
+    return elapsed, response
+
+def request_times(client: httpx.Client, path: str, count: int, headers: Dict[str, str]) -> List[float]:
+    return [timed(client, "GET", path, headers=headers)[0] for _ in range(count)]
+
+def poll_during(client: httpx.Client, stop: threading.Event, failures: List[str], served: List[int]) -> None:
+    # A new connection each time: a worker closing an idle keep-alive
+    # connection while the client reuses it is a race clients retry, not a
+    # refused request
+    while not stop.is_set():
+        try:
+            response = client.get("/health", headers={"Connection": "close"})
+            if response.status_code != 200:
+                failures.append(str(response.status_code))
+            else:
+                served[0] += 1
+        except httpx.TransportError as exc:
+            failures.append(type(exc).__name__)
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--server", default="gunicorn", choices=("gunicorn", "uvicorn"))
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--rounds", type=int, default=5, help="fresh interpreters timed for the import")
+    parser.add_argument("--settle", type=float, default=3.0, help="seconds to let process pools finish starting")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    subprocess.run([sys.executable, "-m", "app.db.migrate"], cwd=ROOT, check=True, capture_output=True)
+    print(f"migrate: {time.perf_counter() - started:.2f}s")
+    print(f"import app.main: {import_time(args.rounds) * 1000:.0f}ms (median of {args.rounds})")
+
+    port = free_port()
+    if args.server == "gunicorn":
+        # Through the environment rather than --workers, which the config
+        # file would not see when it sizes the process pools
+        os.environ["WEB_CONCURRENCY"] = str(args.workers)
+        command = [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "--bind", f"127.0.0.1:{port}"]
+    else:
+        command = [
+            sys.executable, "-m", "uvicorn", "app.main:app",
+            "--port", str(port), "--workers", str(args.workers),
+        ]
+    server = Server(command)
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=30) as client:
+            print(f"first /health answer: {first_answer(client, server.started) * 1000:.0f}ms")
+            ready = server.wait_for(READY, args.workers, server.started)
+            print(f"all {args.workers} workers started: {ready * 1000:.0f}ms")
+            # Process pools keep starting in the background after the lifespan
+            time.sleep(args.settle)
+
+            user = {"email": "cold@example.com", "username": "cold", "password": "cold-start"}
+            register, _ = timed(client, "POST", "/api/v1/auth/register", json=user)
+            login, response = timed(
+                client, "POST", "/api/v1/auth/login", data={"username": "cold", "password": "cold-start"}
+            )
+            print(f"first register {register * 1000:.0f}ms, first login {login * 1000:.0f}ms")
+
+            # A new connection per request spreads the first ones over the workers
+            headers = {"Authorization": f"Bearer {response.json()['access_token']}", "Connection": "close"}
+            path = "/api/v1/posts/?limit=20"
+            first = request_times(client, path, args.workers * 2, headers)
+            warm = statistics.median(request_times(client, path, 50, headers))
+            print(
+                f"first requests {', '.join(f'{t * 1000:.1f}' for t in first)}ms, "
+                f"warm median {warm * 1000:.1f}ms"
+            )
+
+            if args.server == "gunicorn":
+                stop, failures, served = threading.Event(), [], [0]
+                poller = threading.Thread(target=poll_during, args=(client, stop, failures, served))
+                poller.start()
+                restarted = time.perf_counter()
+                server.process.send_signal(signal.SIGHUP)
+                ready = server.wait_for(READY, args.workers, restarted)
+                time.sleep(0.5)
+                stop.set()
+                poller.join()
+                print(
+                    f"graceful restart (SIGHUP): workers replaced in {ready * 1000:.0f}ms, "
+                    f"{served[0]} requests served, {len(failures)} failed {failures[:5]}"
+                )
+                # Shutdown waits for pools that are still importing
+                time.sleep(args.settle)
+
+        stopping = time.perf_counter()
+        server.process.send_signal(signal.SIGTERM)
+        server.process.wait(timeout=60)
+        print(f"shutdown (SIGTERM): {(time.perf_counter() - stopping) * 1000:.0f}ms")
+    finally:
+        if server.process.poll() is None:
+            server.process.kill()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,23 @@
+import os
+import tempfile
+from typing import Optional
+
+_directory: Optional[str] = None
+
+def use_scratch_database(name: str) -> str:
+    """Point the app at a throwaway SQLite database and media directory.
+
+    Must be called before anything under ``app`` is imported, since settings
+    and the engine are created at import time. Returns the scratch directory.
+    Later calls, e.g. from a benchmark module imported by another, keep the
+    first database and return its directory.
+    """
+    global _directory
+    if _directory is not None:
+        return _directory
+    _directory = tempfile.mkdtemp(prefix=f"{name}_")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_directory, name)}.db"
+    os.environ["MEDIA_PATH"] = os.path.join(_directory, "media")
+    os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+    os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "60")
+    return _directory
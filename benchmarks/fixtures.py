@@ -0,0 +1,53 @@
+"""The small social graph the endpoint checks run against.
+
+Import it after ``use_scratch_database``, like anything under ``app``.
+"""
+from typing import NamedTuple
+from app import crud, models
+from app.db.migrate import migrate
+from app.db.session import SessionLocal
+
+class Seeded(NamedTuple):
+    viewer_id: int
+    post_id: int  # the viewer's first post
+
+def seed(authors: int = 5, posts_per_author: int = 10, engagement: int = 8) -> Seeded:
+    """Migrate the database and fill it with a viewer and their network.
+
+    user0 is the viewer. It follows the authors user2 to user{authors - 1},
+    so user1 is left free to follow. The last of them reads as fan-out on
+    read, so the feed merges pulled posts. Every author has
+    ``posts_per_author`` posts, each liked and commented on by the
+    ``engagement`` remaining users, who all follow the viewer.
+    """
+    migrate()
+    db = SessionLocal()
+    users = [
+        models.User(email=f"user{i}@example.com", username=f"user{i}", hashed_password="x")
+        for i in range(authors + engagement)
+    ]
+    db.add_all(users)
+    db.flush()
+    viewer, celebrity = users[0], users[authors - 1]
+    viewer.following.extend(users[2:authors])
+    celebrity.fanout_on_read = True
+    for user in users[authors:]:
+        user.following.append(viewer)
+
+    for author in users[:authors]:
+        for n in range(posts_per_author):
+            post = models.Post(content=f"post {n} by {author.username}", author_id=author.id)
+            db.add(post)
+            db.flush()
+            for user in users[authors:]:
+                db.add(models.Like(post_id=post.id, user_id=user.id))
+                db.add(models.Comment(content="nice", post_id=post.id, author_id=user.id))
+            post.likes_count = post.comments_count = engagement
+            db.add(models.PostScore(post_id=post.id, score=float(post.id)))
+
+    crud.reconcile_follow_counts(db)
+    crud.rebuild_timelines(db)
+    db.commit()
+    seeded = Seeded(viewer.id, viewer.posts[0].id)
+    db.close()
+    return seeded
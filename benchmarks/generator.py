@@ -0,0 +1,207 @@
+"""Seeded synthetic social graph: users, follows, posts, likes and comments.
+
+Popularity is Zipf-distributed, so a few users have most of the followers
+and their posts collect most of the likes, while following counts have a
+Pareto tail. Post, like and comment times spread over the last ``days``
+days, with ids increasing in time. Every row, counter, fan-out flag and
+trending score is computed in memory and inserted with one executemany per
+table; timelines are then rebuilt in SQL and the search index in one pass.
+The same ``seed`` always gives the same data.
+
+Usage: python -m benchmarks.generator [profile]
+"""
+import sys
+from benchmarks.env import use_scratch_database
+
+use_scratch_database("generator")
+
+import itertools
+import random
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Sequence, Tuple
+from sqlalchemy import func, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from app import crud
+from app.core import trending
+from app.core.config import settings
+from app.db import search
+from app.db.base import Base
+from app.models.timeline import TimelineEntry
+
+# Row counts per scale; follows, likes and comments are approximate since
+# duplicate pairs are dropped
+PROFILES: Dict[str, Dict[str, int]] = {
+    "tiny": {"users": 200, "posts": 2000, "follows_per_user": 20, "likes": 10000, "comments": 2000},
+    "small": {"users": 2000, "posts": 20000, "follows_per_user": 40, "likes": 100000, "comments": 20000},
+    "medium": {"users": 20000, "posts": 200000, "follows_per_user": 50, "likes": 1000000, "comments": 200000},
+    "large": {"users": 100000, "posts": 1000000, "follows_per_user": 50, "likes": 5000000, "comments": 1000000},
+}
+
+WORDS = (
+    "coffee morning run city night music game team code release photo trip beach "
+    "book movie dinner friends weekend launch update idea design data cloud python "
+    "garden rain sunset travel food art news sport market family dog cat learn"
+).split()
+
+def _zipf_weights(count: int, exponent: float, rng: random.Random) -> List[float]:
+    # Cumulative weights of 1 / rank ** exponent, with ranks shuffled over ids
+    ranks = list(range(1, count + 1))
+    rng.shuffle(ranks)
+    return list(itertools.accumulate(1 / rank ** exponent for rank in ranks))
+
+def random_text(rng: random.Random, low: int, high: int) -> str:
+    """Between ``low`` and ``high`` random words"""
+    return " ".join(rng.choices(WORDS, k=rng.randint(low, high)))
+
+def _engagement(
+    rng: random.Random,
+    count: int,
+    post_weights: Sequence[float],
+    user_weights: Sequence[float],
+    post_times: Sequence[float],
+    now: float
+) -> List[Tuple[int, int, float]]:
+    """``count`` distinct (post_id, user_id, timestamp) picks, after their post"""
+    posts = rng.choices(range(1, len(post_times) + 1), cum_weights=post_weights, k=count)
+    users = rng.choices(range(1, len(user_weights) + 1), cum_weights=user_weights, k=count)
+    picked = {}
+    for post_id, user_id in zip(posts, users):
+        if (post_id, user_id) not in picked:
+            # Most engagement arrives within hours of posting
+            at = min(post_times[post_id - 1] + rng.expovariate(1 / 7200), now)
+            picked[post_id, user_id] = at
+    return sorted(((post_id, user_id, at) for (post_id, user_id), at in picked.items()), key=lambda row: row[2])
+
+def generate(
+    engine: Engine,
+    users: int,
+    posts: int,
+    follows_per_user: int,
+    likes: int,
+    comments: int,
+    days: int = 30,
+    seed: int = 42
+) -> Dict[str, int]:
+    """Create the schema on ``engine`` and fill it; returns rows per table"""
+    rng = random.Random(seed)
+    end = time.time()
+    start = end - days * 86400
+
+    def stamp(at: float) -> str:
+        # str() is isoformat with a space, several times faster than strftime;
+        # the first 19 characters are the Timestamp storage format
+        return str(datetime.fromtimestamp(int(at), timezone.utc))[:19]
+
+    # Follow graph: followed users by popularity, out-degree from a Pareto tail
+    popularity = _zipf_weights(users, 1.0, rng)
+    follows = set()
+    for follower_id in range(1, users + 1):
+        degree = min(int(rng.paretovariate(1.5) * follows_per_user / 3), users - 1)
+        for followed_id in rng.choices(range(1, users + 1), cum_weights=popularity, k=degree):
+            if followed_id != follower_id:
+                follows.add((follower_id, followed_id))
+    followers_count: Dict[int, int] = defaultdict(int)
+    following_count: Dict[int, int] = defaultdict(int)
+    for follower_id, followed_id in follows:
+        following_count[follower_id] += 1
+        followers_count[followed_id] += 1
+
+    # Posts by activity, which tracks popularity less steeply
+    activity = _zipf_weights(users, 0.6, rng)
+    authors = rng.choices(range(1, users + 1), cum_weights=activity, k=posts)
+    post_times = sorted(rng.uniform(start, end) for _ in range(posts))
+    post_weights = list(itertools.accumulate(followers_count[author] + 1 for author in authors))
+
+    like_rows = _engagement(rng, likes, post_weights, activity, post_times, end)
+    comment_rows = _engagement(rng, comments, post_weights, activity, post_times, end)
+    likes_count: Dict[int, int] = defaultdict(int)
+    comments_count: Dict[int, int] = defaultdict(int)
+    events: Dict[int, List[trending.Event]] = defaultdict(list)
+    half_life = settings.TRENDING_HALF_LIFE_SECONDS
+    for rows, counts, weight in (
+        (like_rows, likes_count, settings.TRENDING_LIKE_WEIGHT),
+        (comment_rows, comments_count, settings.TRENDING_COMMENT_WEIGHT),
+    ):
+        for post_id, _, at in rows:
+            counts[post_id] += 1
+            # Older engagement has long decayed below the pruning threshold
+            if end - at < half_life * 10:
+                events[post_id].append((weight, datetime.fromtimestamp(at, timezone.utc)))
+    scores = [(post_id, trending.combine(None, post_events, half_life)) for post_id, post_events in events.items()]
+
+    Base.metadata.create_all(bind=engine)
+    fts = search.supported(engine)
+    tables = {
+        "user": (
+            'INSERT INTO "user" (id, email, username, hashed_password, full_name, is_active, '
+            "fanout_on_read, followers_count, following_count, created_at) "
+            "VALUES (?, ?, ?, 'x', ?, 1, ?, ?, ?, ?)",
+            [
+                (
+                    id, f"user{id}@example.com", f"user{id}", f"User {id}",
+                    followers_count[id] > settings.FANOUT_MAX_FOLLOWERS,
+                    followers_count[id], following_count[id], stamp(start - 86400)
+                )
+                for id in range(1, users + 1)
+            ],
+        ),
+        "followers": (
+            "INSERT INTO followers (follower_id, followed_id) VALUES (?, ?)",
+            sorted(follows),
+        ),
+        "post": (
+            "INSERT INTO post (id, content, author_id, created_at, likes_count, comments_count) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (id, random_text(rng, 5, 30), author, stamp(at), likes_count[id], comments_count[id])
+                for id, (author, at) in enumerate(zip(authors, post_times), 1)
+            ],
+        ),
+        "like": (
+            'INSERT INTO "like" (id, post_id, user_id, created_at) VALUES (?, ?, ?, ?)',
+            [(id, post_id, user_id, stamp(at)) for id, (post_id, user_id, at) in enumerate(like_rows, 1)],
+        ),
+        "comment": (
+            "INSERT INTO comment (id, content, post_id, author_id, created_at) VALUES (?, ?, ?, ?, ?)",
+            [
+                (id, random_text(rng, 2, 12), post_id, user_id, stamp(at))
+                for id, (post_id, user_id, at) in enumerate(comment_rows, 1)
+            ],
+        ),
+        "post_score": (
+            "INSERT INTO post_score (post_id, score) VALUES (?, ?)",
+            [(post_id, score) for post_id, score in scores if score is not None],
+        ),
+    }
+
+    with engine.begin() as conn:
+        if fts:
+            search.drop_triggers(conn)
+        for sql, rows in tables.values():
+            conn.exec_driver_sql(sql, rows)
+        if fts:
+            search.install(conn)
+            search.rebuild(conn)
+    counts = {table: len(rows) for table, (_, rows) in tables.items()}
+    with Session(bind=engine) as db:
+        crud.rebuild_timelines(db)
+        db.commit()
+        counts["timeline_entry"] = db.scalar(select(func.count()).select_from(TimelineEntry))
+    return counts
+
+def main() -> None:
+    from app.db.session import engine
+
+    profile = sys.argv[1] if len(sys.argv) > 1 else "small"
+    started = time.perf_counter()
+    counts = generate(engine, **PROFILES[profile])
+    elapsed = time.perf_counter() - started
+    total = sum(counts.values())
+    print(", ".join(f"{table} {count}" for table, count in counts.items()))
+    print(f"{total} rows in {elapsed:.1f}s ({total / elapsed:.0f} rows/s), database {engine.url.database}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+"""Scenario-driven load run against the in-process app.
+
+Generates a profile with ``benchmarks.generator``, then sends a weighted mix
+of requests from ``--concurrency`` concurrent clients through the ASGI
+interface, so no server or network is involved. Viewers are picked by the
+same activity skew as the data. Reports p50/p95/p99 latency, throughput and
+SQL statements per request for every scenario; each request is wrapped in
+the app's own per-request SQL tracking.
+
+``--save`` writes the report as a JSON baseline; ``--compare`` checks a run
+against one and exits with status 1 if a scenario's p95 latency grew by more
+than ``--tolerance`` or it runs half a statement per request more than before.
+
+Usage: python -m benchmarks.load [--profile small] [--requests 2000]
+       [--concurrency 16] [--seed 1] [--save FILE] [--compare FILE] [--verbose]
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import math
+import random
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from benchmarks.env import use_scratch_database
+
+use_scratch_database("load")
+
+import httpx
+from app.core.config import settings
+from app.core.security import create_access_token
+from app.db import instrumentation
+from app.db.session import engine
+from app.main import app
+from benchmarks.generator import PROFILES, WORDS, generate, random_text
+
+class Scenario:
+    """One kind of request; ``build(rng, users, posts)`` returns (path, JSON body or None)"""
+
+    def __init__(
+        self,
+        name: str,
+        weight: int,
+        method: str,
+        route: str,
+        build: Callable[[random.Random, int, int], Tuple[str, Optional[Dict[str, Any]]]]
+    ) -> None:
+        self.name = name
+        self.weight = weight
+        self.method = method
+        self.route = route
+        self.build = build
+
+API = settings.API_V1_STR
+
+def _comment(post_id: int, content: str) -> Tuple[str, Dict[str, Any]]:
+    # CommentCreate repeats the post id in the body
+    return f"{API}/posts/{post_id}/comments", {"content": content, "post_id": post_id}
+
+# A read-heavy mix. ``route`` is the template the app labels the requests
+# with in its metrics, reported alongside each scenario.
+SCENARIOS = [
+    Scenario("feed", 30, "GET", f"{API}/posts/feed", lambda rng, users, posts: (
+        f"{API}/posts/feed?limit=20&view=summary", None
+    )),
+    Scenario("feed_full", 5, "GET", f"{API}/posts/feed", lambda rng, users, posts: (
+        f"{API}/posts/feed?limit=20", None
+    )),
+    Scenario("posts", 10, "GET", f"{API}/posts/", lambda rng, users, posts: (
+        f"{API}/posts/?limit=20&view=summary", None
+    )),
+    Scenario("post", 15, "GET", f"{API}/posts/{{post_id}}", lambda rng, users, posts: (
+        f"{API}/posts/{rng.randint(1, posts)}", None
+    )),
+    Scenario("comments", 8, "GET", f"{API}/posts/{{post_id}}/comments", lambda rng, users, posts: (
+        f"{API}/posts/{rng.randint(1, posts)}/comments?limit=20", None
+    )),
+    Scenario("profile", 8, "GET", f"{API}/users/{{username}}", lambda rng, users, posts: (
+        f"{API}/users/user{rng.randint(1, users)}", None
+    )),
+    Scenario("trending", 5, "GET", f"{API}/posts/trending", lambda rng, users, posts: (
+        f"{API}/posts/trending?limit=20&view=summary", None
+    )),
+    Scenario("search", 4, "GET", f"{API}/posts/search", lambda rng, users, posts: (
+        f"{API}/posts/search?q={rng.choice(WORDS)}&limit=20&view=summary", None
+    )),
+    Scenario("like", 8, "POST", f"{API}/posts/{{post_id}}/like", lambda rng, users, posts: (
+        f"{API}/posts/{rng.randint(1, posts)}/like", None
+    )),
+    Scenario("unlike", 4, "DELETE", f"{API}/posts/{{post_id}}/unlike", lambda rng, users, posts: (
+        f"{API}/posts/{rng.randint(1, posts)}/unlike", None
+    )),
+    Scenario("comment", 3, "POST", f"{API}/posts/{{post_id}}/comments", lambda rng, users, posts: _comment(
+        rng.randint(1, posts), random_text(rng, 2, 12)
+    )),
+]
+
+def percentile(ordered: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an ascending list"""
+    return ordered[max(math.ceil(fraction * len(ordered)) - 1, 0)]
+
+async def run(requests: int, concurrency: int, users: int, posts: int, seed: int) -> Dict[str, Any]:
+    rng = random.Random(seed)
+    tokens: Dict[int, str] = {}
+    weights = [scenario.weight for scenario in SCENARIOS]
+    # Viewers skew towards low ids the way activity does in the generated data
+    viewers = list(itertools.accumulate(1 / rank ** 0.6 for rank in range(1, users + 1)))
+    plan = [
+        (scenario, scenario.build(rng, users, posts), rng.choices(range(1, users + 1), cum_weights=viewers)[0])
+        for scenario in rng.choices(SCENARIOS, weights=weights, k=requests)
+    ]
+    latencies: Dict[str, List[float]] = {scenario.name: [] for scenario in SCENARIOS}
+    errors: Dict[str, int] = {scenario.name: 0 for scenario in SCENARIOS}
+    statements: Dict[str, int] = {scenario.name: 0 for scenario in SCENARIOS}
+    queue = iter(plan)
+
+    async def client_loop(client: httpx.AsyncClient) -> None:
+        for scenario, (path, body), viewer in queue:
+            if viewer not in tokens:
+                tokens[viewer] = create_access_token(viewer)
+            started = time.perf_counter()
+            # The in-process transport runs the app in this task, so the
+            # statements of this request alone are counted
+            with instrumentation.track_request() as stats:
+                response = await client.request(
+                    scenario.method, path, json=body, headers={"Authorization": f"Bearer {tokens[viewer]}"}
+                )
+            latencies[scenario.name].append(time.perf_counter() - started)
+            statements[scenario.name] += stats.statements
+            if response.status_code >= 400:
+                errors[scenario.name] += 1
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://load") as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(client_loop(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    report: Dict[str, Any] = {}
+    for scenario in SCENARIOS:
+        ordered = sorted(latencies[scenario.name])
+        if not ordered:
+            continue
+        report[scenario.name] = {
+            "route": f"{scenario.method} {scenario.route}",
+            "requests": len(ordered),
+            "errors": errors[scenario.name],
+            "throughput": round(len(ordered) / elapsed, 1),
+            "p50_ms": round(percentile(ordered, 0.50) * 1000, 2),
+            "p95_ms": round(percentile(ordered, 0.95) * 1000, 2),
+            "p99_ms": round(percentile(ordered, 0.99) * 1000, 2),
+            "sql_per_request": round(statements[scenario.name] / len(ordered), 2),
+        }
+    return {"elapsed_s": round(elapsed, 2), "throughput": round(requests / elapsed, 1), "scenarios": report}
+
+def compare(result: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Regressions of ``result`` against ``baseline``, as messages"""
+    regressions = []
+    for name, current in result["scenarios"].items():
+        previous = baseline["scenarios"].get(name)
+        if previous is None:
+            continue
+        if current["p95_ms"] > previous["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {previous['p95_ms']}ms -> {current['p95_ms']}ms")
+        # Averages move a little with the interleaving of writes
+        if current["sql_per_request"] >= previous["sql_per_request"] + 0.5:
+            regressions.append(
+                f"{name}: SQL per request {previous['sql_per_request']} -> {current['sql_per_request']}"
+            )
+    return regressions
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--profile", default="small", choices=sorted(PROFILES))
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--save", help="write the report to this JSON file")
+    parser.add_argument("--compare", help="baseline JSON file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed p95 growth, 0.25 = 25%%")
+    parser.add_argument("--verbose", action="store_true", help="show the app's slow query and N+1 warnings")
+    args = parser.parse_args(argv)
+    if not args.verbose:
+        # Under full concurrency on SQLite most statements wait on the lock
+        # long enough to count as slow
+        logging.getLogger("app").setLevel(logging.ERROR)
+
+    profile = PROFILES[args.profile]
+    started = time.perf_counter()
+    rows = generate(engine, **profile)
+    print(f"generated {sum(rows.values())} rows for {args.profile} in {time.perf_counter() - started:.1f}s")
+
+    result = asyncio.run(run(args.requests, args.concurrency, profile["users"], profile["posts"], args.seed))
+    result = {
+        "profile": args.profile,
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "seed": args.seed,
+        **result,
+    }
+    print(f"{'scenario':12} {'reqs':>5} {'err':>4} {'req/s':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'sql':>5}")
+    for name, row in result["scenarios"].items():
+        print(
+            f"{name:12} {row['requests']:5} {row['errors']:4} {row['throughput']:7} "
+            f"{row['p50_ms']:8} {row['p95_ms']:8} {row['p99_ms']:8} {row['sql_per_request']:5}"
+        )
+    print(f"total {result['throughput']} req/s over {result['elapsed_s']}s")
+
+    if args.save:
+        with open(args.save, "w") as file:
+            json.dump(result, file, indent=2)
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+        regressions = compare(result, baseline, args.tolerance)
+        for message in regressions:
+            print(f"REGRESSION {message}")
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
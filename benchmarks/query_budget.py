@@ -0,0 +1,63 @@
+"""Fail if a read endpoint exceeds its SQL statement budget.
+
+Budgets are fixed per request and must not depend on page size or on how
+many likes and comments the posts have.
+
+Usage: python -m benchmarks.query_budget
+"""
+from benchmarks.env import use_scratch_database
+
+use_scratch_database("query_budget")
+
+import time
+from fastapi.testclient import TestClient
+from app.core.security import create_access_token
+from app.db.query_counter import query_budget
+from app.main import app
+from benchmarks.fixtures import seed
+
+# (path, statement budget) for a logged-in viewer
+ENDPOINT_BUDGETS = [
+    ("/api/v1/posts/?limit=20", 5),
+    ("/api/v1/posts/feed?limit=20", 7),
+    ("/api/v1/posts/?limit=20&view=summary", 4),
+    ("/api/v1/posts/feed?limit=20&view=summary", 6),
+    ("/api/v1/posts/{post_id}", 5),
+    ("/api/v1/posts/{post_id}/comments?limit=50", 2),
+    ("/api/v1/posts/trending?limit=20", 5),
+    ("/api/v1/posts/trending?limit=20&view=summary", 4),
+    ("/api/v1/posts/search?q=post&limit=20", 5),
+    ("/api/v1/posts/search?q=po*&limit=20&view=summary", 4),
+]
+
+# (path, statement budget) for answering If-None-Match with a 304
+REVALIDATION_BUDGETS = [
+    ("/api/v1/posts/{post_id}", 1),
+    ("/api/v1/posts/{post_id}/comments?limit=50", 1),
+    ("/api/v1/users/user1", 1),
+]
+
+def main() -> None:
+    viewer_id, post_id = seed()
+    # Validators are only issued once the second of the latest change has ended
+    time.sleep(1)
+    client = TestClient(app)
+    headers = {"Authorization": f"Bearer {create_access_token(viewer_id)}"}
+
+    for path, budget in ENDPOINT_BUDGETS:
+        path = path.format(post_id=post_id)
+        with query_budget(budget) as counter:
+            response = client.get(path, headers=headers)
+        assert response.status_code == 200, response.text
+        print(f"{path:50} {counter.count:3} statements (budget {budget})")
+
+    for path, budget in REVALIDATION_BUDGETS:
+        path = path.format(post_id=post_id)
+        etag = client.get(path, headers=headers).headers["ETag"]
+        with query_budget(budget) as counter:
+            response = client.get(path, headers={**headers, "If-None-Match": etag})
+        assert response.status_code == 304, response.status_code
+        print(f"{path + ' (304)':50} {counter.count:3} statements (budget {budget})")
+
+if __name__ == "__main__":
+    main()
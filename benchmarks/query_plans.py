@@ -0,0 +1,100 @@
+"""Fail if a hot endpoint's SQL falls back to a full table scan.
+
+Every statement the endpoints below execute is replayed under
+``EXPLAIN QUERY PLAN``. A plain ``SCAN <table>`` of a hot table fails the
+check, and each index in ``EXPECTED_INDEXES`` must show up in some plan.
+
+Usage: python -m benchmarks.query_plans
+"""
+from benchmarks.env import use_scratch_database
+
+use_scratch_database("query_plans")
+
+import re
+from typing import Any, List, Set, Tuple
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from app.core.security import create_access_token
+from app.db.session import async_engine, engine
+from app.main import app
+from benchmarks.fixtures import seed
+
+HOT_TABLES = {"user", "post", "comment", "like", "followers", "timeline_entry"}
+
+EXPECTED_INDEXES = {
+    "ix_post_created",
+    "ix_post_author_created",
+    "ix_comment_post_created",
+    "ix_like_user_post",
+    "ix_followers_followed_follower",
+    "ix_timeline_entry_user_created",
+    "ix_user_updated_at",
+    "ix_post_score_score",
+}
+
+# (method, path) run by the viewer; {post_id} is one of the viewer's own posts
+REQUESTS = [
+    ("GET", "/api/v1/posts/?limit=20"),
+    ("GET", "/api/v1/posts/?limit=20&view=summary"),
+    ("GET", "/api/v1/posts/feed?limit=20"),
+    ("GET", "/api/v1/posts/feed?limit=20&view=summary"),
+    ("GET", "/api/v1/posts/{post_id}"),
+    ("GET", "/api/v1/posts/{post_id}/comments?limit=50"),
+    ("GET", "/api/v1/posts/search?q=post&limit=20"),
+    ("GET", "/api/v1/posts/search?q=po*&limit=20&view=summary"),
+    ("POST", "/api/v1/posts/{post_id}/like"),
+    ("GET", "/api/v1/posts/trending?limit=20&view=summary"),
+    ("DELETE", "/api/v1/posts/{post_id}/unlike"),
+    ("GET", "/api/v1/users/user1"),
+    ("POST", "/api/v1/users/user1/follow"),
+    ("DELETE", "/api/v1/users/user1/unfollow"),
+]
+
+FULL_SCAN = re.compile(r"^SCAN (\w+?)(?:_\d+)?$")
+
+def capture(statements: List[Tuple[str, Any]]) -> Any:
+    def listener(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool) -> None:
+        if not executemany:
+            statements.append((statement, parameters))
+    return listener
+
+def main() -> None:
+    viewer_id, post_id = seed()
+    client = TestClient(app)
+    headers = {"Authorization": f"Bearer {create_access_token(viewer_id)}"}
+
+    statements: List[Tuple[str, Any]] = []
+    listener = capture(statements)
+    for target in (engine, async_engine.sync_engine):
+        event.listen(target, "before_cursor_execute", listener)
+    try:
+        for method, path in REQUESTS:
+            response = client.request(method, path.format(post_id=post_id), headers=headers)
+            assert response.status_code == 200, f"{method} {path}: {response.text}"
+        response = client.post("/api/v1/posts/", json={"content": "fresh"}, headers=headers)
+        assert response.status_code == 200, response.text
+    finally:
+        for target in (engine, async_engine.sync_engine):
+            event.remove(target, "before_cursor_execute", listener)
+
+    used: Set[str] = set()
+    failures = []
+    with engine.connect() as conn:
+        for statement, parameters in statements:
+            if statement.lstrip().upper().startswith(("BEGIN", "COMMIT", "ROLLBACK", "PRAGMA")):
+                continue
+            plan = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+            for row in plan:
+                detail = row[-1]
+                used.update(re.findall(r"(?<!VIRTUAL TABLE )INDEX (\w+)", detail))
+                match = FULL_SCAN.match(detail)
+                if match and match.group(1) in HOT_TABLES:
+                    failures.append(f"{detail}\n    {statement}")
+
+    print(f"{len(statements)} statements checked, indexes used: {', '.join(sorted(used))}")
+    missing = EXPECTED_INDEXES - used
+    assert not failures, "Full table scans:\n" + "\n".join(failures)
+    assert not missing, f"Indexes never used: {', '.join(sorted(missing))}"
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""Full-text search over a synthetic corpus: indexing cost and query latency.
+
+Posts are drawn from a Zipf-distributed vocabulary, so there are a few very
+common words and a long tail of rare ones. Posts are inserted with the FTS
+triggers active, then every query runs through ``crud.search_posts`` as the
+endpoint does. LIKE '%word%' is the baseline for the rare word.
+
+Usage: python -m benchmarks.search [posts] [rounds]
+"""
+import os
+import sys
+from benchmarks.env import use_scratch_database
+
+directory = use_scratch_database("search")
+
+import random
+import statistics
+import time
+from typing import Any, Callable, List
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from app import crud
+from app.core.pagination import decode_rank_cursor
+from app.db import search
+from app.db.base import Base
+from app.db.session import build_engine, sqlite_pragmas
+
+VOCABULARY = 50000
+BATCH = 10000
+
+def word(rank: int) -> str:
+    # Deterministic pronounceable words, e.g. 0 -> "de", 1 -> "fi"
+    syllables = []
+    rank += 1
+    while rank:
+        rank, digit = divmod(rank, 30)
+        syllables.append("bdfgklmnprstvz"[digit % 14] + "aeiou"[digit % 5])
+    return "".join(syllables)
+
+def corpus(posts: int) -> Any:
+    rng = random.Random(42)
+    words = [word(rank) for rank in range(VOCABULARY)]
+    weights = [1 / (rank + 1) for rank in range(VOCABULARY)]
+    cumulative = []
+    total = 0.0
+    for weight in weights:
+        total += weight
+        cumulative.append(total)
+    for _ in range(posts):
+        yield " ".join(rng.choices(words, cum_weights=cumulative, k=rng.randint(6, 30)))
+
+def timed(run: Callable[[], Any], rounds: int) -> List[float]:
+    run()
+    latencies = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        run()
+        latencies.append(time.perf_counter() - started)
+    return sorted(latencies)
+
+def report(name: str, latencies: List[float]) -> None:
+    p95 = latencies[min(int(len(latencies) * 0.95), len(latencies) - 1)]
+    print(f"{name:32} p50 {statistics.median(latencies) * 1000:8.2f}ms  p95 {p95 * 1000:8.2f}ms")
+
+def main() -> None:
+    posts = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    engine = build_engine(f"sqlite:///{os.path.join(directory, 'search.db')}", sqlite_pragmas())
+    Base.metadata.create_all(bind=engine)
+
+    with engine.begin() as conn:
+        conn.execute(text(
+            "INSERT INTO \"user\" (email, username, hashed_password, is_active, followers_count, following_count) "
+            "VALUES ('a@example.com', 'author', 'x', 1, 0, 0)"
+        ))
+    started = time.perf_counter()
+    batch = []
+    for content in corpus(posts):
+        batch.append({"content": content})
+        if len(batch) == BATCH:
+            with engine.begin() as conn:
+                conn.execute(text("INSERT INTO post (content, author_id) VALUES (:content, 1)"), batch)
+            batch = []
+    if batch:
+        with engine.begin() as conn:
+            conn.execute(text("INSERT INTO post (content, author_id) VALUES (:content, 1)"), batch)
+    elapsed = time.perf_counter() - started
+    print(f"inserted {posts} posts through the triggers in {elapsed:.1f}s ({posts / elapsed:.0f}/s)")
+
+    started = time.perf_counter()
+    with engine.begin() as conn:
+        search.rebuild(conn)
+    print(f"rebuilt the index in {time.perf_counter() - started:.1f}s")
+
+    common, mid, rare = word(0), word(300), word(VOCABULARY // 2)
+    db = Session(bind=engine)
+    def run(query: str, cursor: Any = None) -> Callable[[], Any]:
+        return lambda: crud.search_posts(db, query, cursor, 20, True, None)
+
+    page = crud.search_posts(db, common, None, 20, True, None)
+    deep = crud.search_posts(db, common, decode_rank_cursor(page["next_cursor"]), 20, True, None)
+    assert deep["items"], "expected a second page"
+
+    report(f"rare word ({rare})", timed(run(rare), rounds))
+    report(f"mid word ({mid})", timed(run(mid), rounds))
+    report(f"common word ({common})", timed(run(common), rounds))
+    report("common word, second page", timed(run(common, decode_rank_cursor(page["next_cursor"])), rounds))
+    report(f"two words ({common} {mid})", timed(run(f"{common} {mid}"), rounds))
+    report(f"prefix ({rare[:2]}*)", timed(run(rare[:2] + "*"), rounds))
+    report(f"prefix ({rare[:4]}*)", timed(run(rare[:4] + "*"), rounds))
+    report("absent word", timed(run("zzzz"), rounds))
+    # LIKE stops at the first 20 hits but scans the whole table when little matches
+    for pattern in (rare, "zzzz"):
+        report(f"LIKE '%{pattern}%' baseline", timed(
+            lambda: db.execute(
+                text("SELECT id FROM post WHERE content LIKE :pattern ORDER BY id LIMIT 20"),
+                {"pattern": f"%{pattern}%"}
+            ).all(),
+            max(rounds // 4, 1)
+        ))
+    db.close()
+    engine.dispose()
+
+if __name__ == "__main__":
+    main()
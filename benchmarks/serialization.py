@@ -0,0 +1,65 @@
+"""Compare per-item serialization cost of FastAPI's default path and ``app.core.serialization``.
+
+The default path is what a ``response_model`` endpoint returning plain data
+does: validate against the response field, ``jsonable_encoder`` the result and
+render a ``JSONResponse``. Both paths must produce identical bytes.
+
+Usage: python -m benchmarks.serialization [rounds]
+"""
+import sys
+from benchmarks.env import use_scratch_database
+
+use_scratch_database("serialization")
+
+import asyncio
+import time
+from typing import Any, Callable
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from app import crud, schemas
+from app.core import serialization
+from app.db.session import SessionLocal
+from benchmarks.fixtures import seed
+
+PAGE_SIZE = 20
+
+def default_path(model: Any, content: Any) -> bytes:
+    field = create_response_field(name="Response", type_=model)
+    async def serialize() -> bytes:
+        return JSONResponse(await serialize_response(field=field, response_content=content)).body
+    return asyncio.run(serialize())
+
+def per_item(run: Callable[[], Any], rounds: int, items: int) -> float:
+    run()
+    started = time.perf_counter()
+    for _ in range(rounds):
+        run()
+    return (time.perf_counter() - started) / rounds / items * 1e6
+
+def main() -> None:
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    viewer_id, _ = seed()
+    db = SessionLocal()
+
+    for name, model, summary in (
+        ("full", schemas.PostPage, False),
+        ("summary", schemas.PostSummaryPage, True),
+    ):
+        page = crud.list_posts(db, None, PAGE_SIZE, summary, viewer_id)
+        items = len(page["items"])
+        assert default_path(model, page) == serialization.dump(model, page), f"{name}: output differs"
+
+        field = create_response_field(name="Response", type_=model)
+        async def default_rounds() -> None:
+            for _ in range(rounds):
+                JSONResponse(await serialize_response(field=field, response_content=page)).body
+        started = time.perf_counter()
+        asyncio.run(default_rounds())
+        before = (time.perf_counter() - started) / rounds / items * 1e6
+        after = per_item(lambda: serialization.dump(model, page), rounds, items)
+        print(f"{name:8} default {before:8.1f}us/item  serialization {after:8.1f}us/item  {before / after:5.1f}x")
+    db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""Compare mixed read/write throughput under SQLite's defaults and the tuned profile.
+
+Writer threads like posts and bump the counter in one transaction, as the like
+endpoint does; reader threads page through the newest posts at the same time.
+Each profile runs against a fresh database file.
+
+Usage: python -m benchmarks.sqlite_concurrency [seconds] [writers] [readers]
+"""
+import os
+import sys
+from benchmarks.env import use_scratch_database
+
+directory = use_scratch_database("sqlite_concurrency")
+
+import statistics
+import threading
+import time
+from typing import Any, Dict, List
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+import app.db.base_class  # noqa: F401  registers the models
+from app.db.base import Base
+from app.db.session import build_engine, sqlite_pragmas
+
+POSTS = 200
+
+# No pragmas: rollback journal, synchronous=FULL and the driver's 5s timeout
+PROFILES = {
+    "default": {},
+    "tuned": sqlite_pragmas(),
+}
+
+def seed(engine: Any, users: int) -> None:
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(
+            text('INSERT INTO "user" (email, username, hashed_password) VALUES (:email, :username, \'x\')'),
+            [{"email": f"u{i}@example.com", "username": f"u{i}"} for i in range(users)]
+        )
+        conn.execute(
+            text("INSERT INTO post (content, author_id) VALUES (:content, 1)"),
+            [{"content": f"post {i}"} for i in range(POSTS)]
+        )
+
+def writer(engine: Any, user_id: int, stop: threading.Event, stats: Dict[str, List]) -> None:
+    post_id = 0
+    while not stop.is_set():
+        post_id = post_id % POSTS + 1
+        started = time.perf_counter()
+        try:
+            with engine.begin() as conn:
+                conn.execute(
+                    text('INSERT OR IGNORE INTO "like" (user_id, post_id) VALUES (:u, :p)'),
+                    {"u": user_id, "p": post_id}
+                )
+                conn.execute(
+                    text("UPDATE post SET likes_count = likes_count + 1 WHERE id = :p"),
+                    {"p": post_id}
+                )
+        except OperationalError:
+            stats["write_errors"].append(1)
+            continue
+        stats["write"].append(time.perf_counter() - started)
+
+def reader(engine: Any, stop: threading.Event, stats: Dict[str, List]) -> None:
+    while not stop.is_set():
+        started = time.perf_counter()
+        try:
+            with engine.connect() as conn:
+                conn.execute(text(
+                    "SELECT id, content, likes_count FROM post "
+                    "ORDER BY created_at DESC, id DESC LIMIT 20"
+                )).all()
+                conn.execute(text('SELECT count(*) FROM "like"')).scalar()
+        except OperationalError:
+            stats["read_errors"].append(1)
+            continue
+        stats["read"].append(time.perf_counter() - started)
+
+def run(name: str, pragmas: Dict[str, Any], seconds: float, writers: int, readers: int) -> None:
+    url = f"sqlite:///{os.path.join(directory, name)}.db"
+    engine = build_engine(url, pragmas)
+    seed(engine, writers)
+
+    stats: Dict[str, List] = {"write": [], "read": [], "write_errors": [], "read_errors": []}
+    stop = threading.Event()
+    threads = [
+        threading.Thread(target=writer, args=(engine, user_id, stop, stats))
+        for user_id in range(1, writers + 1)
+    ] + [
+        threading.Thread(target=reader, args=(engine, stop, stats))
+        for _ in range(readers)
+    ]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    engine.dispose()
+
+    for kind in ("write", "read"):
+        latencies = sorted(stats[kind]) or [0.0]
+        p95 = latencies[int(len(latencies) * 0.95) - 1] if len(latencies) > 1 else latencies[0]
+        print(
+            f"{name:8} {kind:5} {len(stats[kind]) / seconds:8.0f} ops/s"
+            f"  p50 {statistics.median(latencies) * 1000:7.2f}ms"
+            f"  p95 {p95 * 1000:7.2f}ms"
+            f"  errors {len(stats[kind + '_errors'])}"
+        )
+
+def main() -> None:
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 5.0
+    writers = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    readers = int(sys.argv[3]) if len(sys.argv) > 3 else 8
+    for name, pragmas in PROFILES.items():
+        run(name, pragmas, seconds, writers, readers)
+
+if __name__ == "__main__":
+    main()
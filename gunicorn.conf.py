@@ -0,0 +1,65 @@
+"""Production server: gunicorn -c gunicorn.conf.py
+
+Run ``python -m app.db.migrate`` first; workers never create or alter the
+schema. The master imports the app once (``preload_app``) and forks
+uvicorn workers from it; each worker then runs the app's lifespan startup
+on its own. Signals to the master:
+
+- HUP: replace the workers gracefully, e.g. after a config change. They are
+  forked from the already loaded app, so this does not pick up new code.
+- USR2, then WINCH and QUIT to the old master once the new one is up:
+  deploy new code with no dropped connections.
+- TERM: stop, letting requests in flight finish within ``graceful_timeout``.
+"""
+import multiprocessing
+import os
+import tempfile
+
+wsgi_app = "app.main:app"
+bind = os.getenv("BIND", "0.0.0.0:8000")
+
+# One worker per core; an async worker already overlaps I/O
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+
+# Requests in flight get this long to finish on TERM, HUP or a recycle
+graceful_timeout = 30
+timeout = 60
+keepalive = 5
+# Recycle workers now and then to bound memory growth; the jitter keeps
+# them from restarting all at once
+max_requests = 10000
+max_requests_jitter = 1000
+
+accesslog = "-"
+
+# Each worker has its own bcrypt and image process pools; split the cores
+# between the workers instead of giving every worker all of them. Set here
+# because the settings are read when the app is preloaded, right after this.
+_pool_workers = str(max(multiprocessing.cpu_count() // workers, 1))
+os.environ.setdefault("PASSWORD_HASH_WORKERS", _pool_workers)
+os.environ.setdefault("IMAGE_WORKERS", _pool_workers)
+
+# Workers publish their metrics to a shared directory so a scrape of any one
+# of them reports the whole server; a fresh one per master unless set
+if not os.getenv("METRICS_MULTIPROC_DIR"):
+    os.environ["METRICS_MULTIPROC_DIR"] = tempfile.mkdtemp(prefix="social-media-api-metrics-")
+
+def on_starting(server):
+    # Runs after the app is preloaded, with the final worker count
+    from app.core.config import settings
+    if settings.LIKE_WRITE_BEHIND and server.cfg.workers > 1:
+        raise RuntimeError(
+            "LIKE_WRITE_BEHIND buffers likes per process; "
+            f"run one worker (WEB_CONCURRENCY=1), not {server.cfg.workers}"
+        )
+
+def child_exit(server, worker):
+    # Keep an exited worker's counts in /metrics, without its gauges. Runs in
+    # the master's signal handler: an error here must not stop the master.
+    from app.core import metrics
+    try:
+        metrics.archive(os.environ["METRICS_MULTIPROC_DIR"], worker.pid)
+    except Exception:
+        server.log.exception("Could not archive the metrics of worker %s", worker.pid)
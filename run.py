@@ -1,9 +1,12 @@
 import uvicorn
+from app.db.migrate import migrate
 
+# Development server with auto-reload; see gunicorn.conf.py for production
 if __name__ == "__main__":
+    migrate()
     uvicorn.run(
         "app.main:app",
         host="0.0.0.0",
         port=8000,
-        reload=True  
-    )
\ No newline at end of file
+        reload=True
+    )